@@ -0,0 +1,113 @@
+"""Realtime eye-focus and face-direction session on one camera.
+
+Each frame is captured once, preprocessed once into a shared 64x64 tensor and
+scored by both models in a single forward pass: detection.h5 and
+face_direction_model_final.h5 are fused into one Keras graph over the shared
+input. Both results are drawn on the frame and every scored frame produces a
+combined record (one JSON object per line in --records, if given).
+
+    python RealtimeSession.py --records session.jsonl --stride 2
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import numpy as np
+import cv2
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.model_registry import registry
+from adhd.frame_sources import add_source_arguments, open_source
+from adhd.preprocessing import FrameBuffer
+from adhd.realtime import CHANGE_THRESHOLD, INFERENCE_STRIDE, ChangeGate, RealtimePipeline
+
+# Correct face directions mapping (bottom, left, right, top)
+directions = ['bottom', 'left', 'right', 'top']
+
+# Text colour of each direction
+direction_colors = {
+    'bottom': (0, 0, 255),
+    'left': (255, 0, 0),
+    'right': (255, 255, 0),
+    'top': (0, 255, 0),
+}
+
+def load_session_model():
+    """Returns a function scoring a (N, 64, 64, 3) batch with both models as one (N, 1 + 4) array."""
+    eye_model = registry.get('eye_focus')
+    face_model = registry.get('face_direction')
+    if not (hasattr(eye_model, 'model') and hasattr(face_model, 'model')):
+        # TFLite backend: the interpreters can't be fused, so run them back to back
+        return lambda batch: np.concatenate([eye_model.predict_on_batch(batch), face_model.predict_on_batch(batch)], axis=1)
+
+    import tensorflow as tf
+    from common.inference import CompiledModel
+
+    inputs = tf.keras.Input(shape=eye_model.input_shape[1:])
+    outputs = tf.keras.layers.Concatenate()([eye_model.model(inputs), face_model.model(inputs)])
+    fused_model = CompiledModel(tf.keras.Model(inputs, outputs))
+    fused_model.warm_up()
+    return fused_model.predict_on_batch
+
+class SessionScorer:
+    """Scores frames with both models and writes one combined record per scored frame."""
+
+    def __init__(self, predict_fn, records=None):
+        self.predict_fn = predict_fn
+        self.records = records
+        self.frames = 0
+        self.frame_buffer = FrameBuffer()
+
+    def __call__(self, frame):
+        start = time.perf_counter()
+        # One shared model input for both models
+        scores = np.asarray(self.predict_fn(self.frame_buffer.fill_one(frame)))[0]
+
+        focus_score = float(scores[0])
+        direction_scores = scores[1:]
+        record = {
+            'frame': self.frames,
+            'time': time.time(),
+            'focus': "Focus" if focus_score > 0.5 else "Not Focus",
+            'focus_score': round(focus_score, 4),
+            'direction': directions[int(np.argmax(direction_scores))],
+            'direction_scores': [round(float(s), 4) for s in direction_scores],
+            'latency_ms': round((time.perf_counter() - start) * 1000, 2),
+        }
+        self.frames += 1
+        if self.records is not None:
+            self.records.write(json.dumps(record) + '\n')
+        return record
+
+# Runs on the display thread with the newest record
+def draw_record(frame, record):
+    color = (0, 255, 0) if record['focus'] == "Focus" else (0, 0, 255)
+    cv2.putText(frame, record['focus'], (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, color, 2, cv2.LINE_AA)
+    cv2.putText(frame, f"Face Direction: {record['direction'].capitalize()}", (50, 90), cv2.FONT_HERSHEY_SIMPLEX, 1,
+                direction_colors[record['direction']], 2, cv2.LINE_AA)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_source_arguments(parser)
+    parser.add_argument('--stride', type=int, default=INFERENCE_STRIDE, help='score every Nth captured frame')
+    parser.add_argument('--change-threshold', type=float, default=CHANGE_THRESHOLD,
+                        help='reuse the last result while the frame changed less than this (0 disables)')
+    parser.add_argument('--records', help='append per-frame records to this JSON-lines file')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+    records = open(args.records, 'a', buffering=1) if args.records else None
+    try:
+        scorer = SessionScorer(load_session_model(), records)
+        cap = open_source(args.source)
+        gate = ChangeGate(scorer, threshold=args.change_threshold)
+        RealtimePipeline(cap, gate, draw_record, stride=args.stride, window_name='ADHD Session',
+                         headless=args.headless, duration=args.duration).run()
+    finally:
+        if records is not None:
+            records.close()
+
+if __name__ == '__main__':
+    main()
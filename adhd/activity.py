@@ -0,0 +1,76 @@
+"""Scoring of FindTheObject activity sessions with the activity classifier.
+
+Sessions are scored as one DataFrame, so a whole class costs a single
+vectorized `predict` + `inverse_transform` call. A single session (the GET
+endpoint) skips the batch normalization and builds its one-row frame directly.
+"""
+import numpy as np
+import pandas as pd
+
+from common.model_registry import registry
+
+# Request field -> model column, in the column order the model was trained on
+FEATURES = {
+    'differences_of_two_pictures': 'Differences of Two Pictures',
+    'time_taken_to_find_the_object': 'Time Taken to Find the Object',
+    'find_the_object': 'Find the Object',
+    'eye_tracking': 'Eye Tracking',
+}
+
+# Values used for fields a session leaves out
+DEFAULTS = {
+    'differences_of_two_pictures': 5,
+    'time_taken_to_find_the_object': 30,
+    'find_the_object': 'Yes',
+    'eye_tracking': 'Focus',
+}
+
+NUMERIC_FEATURES = ['differences_of_two_pictures', 'time_taken_to_find_the_object']
+
+
+def sessions_frame(sessions):
+    """Builds the model input from a DataFrame or a list of dicts keyed by request field or model column."""
+    frame = pd.DataFrame(sessions)
+    for field, column in FEATURES.items():
+        if column in frame:
+            # Sessions of one batch may use either key; the request field wins where a session gives both
+            values = frame.pop(column)
+            frame[field] = frame[field].combine_first(values) if field in frame else values
+    for field, default in DEFAULTS.items():
+        frame[field] = frame[field].fillna(default) if field in frame else default
+    for field in NUMERIC_FEATURES:
+        values = pd.to_numeric(frame[field], errors='raise')
+        # Like int('2.7'), refuse fractions instead of truncating them
+        if not np.isfinite(values).all() or (values % 1 != 0).any():
+            raise ValueError(f'{field} must be a whole number')
+        frame[field] = values.astype(int)
+    return frame[list(FEATURES)].rename(columns=FEATURES)
+
+
+def session_frame(session):
+    """Builds the one-row model input of a session that has every request field."""
+    return pd.DataFrame({
+        column: [int(session[field]) if field in NUMERIC_FEATURES else session[field]]
+        for field, column in FEATURES.items()
+    })
+
+
+def predict_frame(frame):
+    """Returns the predicted class of every row of a model input frame."""
+    loaded_model = registry.get('adhd_activity')
+    loaded_encoder = registry.get('adhd_activity_encoder')
+    new_data_encoded = loaded_model.predict(frame)
+    return loaded_encoder.inverse_transform(new_data_encoded).tolist()
+
+
+def score_session(session):
+    """Returns the predicted class of one session keyed by request field."""
+    return predict_frame(session_frame(session))[0]
+
+
+def score_sessions(sessions):
+    """Returns the predicted class of every session, in input order."""
+    frame = sessions_frame(sessions)
+    if frame.empty:
+        return []
+    return predict_frame(frame)
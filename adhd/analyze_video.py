@@ -0,0 +1,136 @@
+"""Offline focus and face-direction analysis of a recorded session.
+
+The video is split into segments that a process pool decodes in parallel,
+keeping only frames at --fps and preprocessing them to the models' 64x64
+input inside the workers. Each decoded segment goes through the fused
+eye-focus + face-direction model in one batched pass while the next
+segments are still decoding. The result is a per-second timeline of focus and
+head direction, written as CSV (or Parquet for a .parquet output).
+
+    python analyze_video.py session.mp4 --fps 2 --output session.csv
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from adhd.preprocessing import FrameBuffer
+from adhd.RealtimeSession import directions, load_session_model
+
+# Sampled frames per decoding task
+SEGMENT_FRAMES = 64
+
+
+def video_info(path):
+    """Returns (frame count, frames per second) of a video."""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise ValueError(f'Cannot open video: {path}')
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    cap.release()
+    return frame_count, fps
+
+
+def decode_segment(args):
+    """Decodes the given (ascending) frame indices and returns them with their model inputs.
+
+    Runs in a worker process; only the small 64x64 float32 inputs travel back.
+    """
+    path, indices = args
+    cap = cv2.VideoCapture(path)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, int(indices[0]))
+    buffer = FrameBuffer(batch_size=len(indices))
+
+    position = int(indices[0])
+    decoded = 0
+    for index in indices:
+        # Skip unsampled frames without converting them
+        while position < index:
+            if not cap.grab():
+                break
+            position += 1
+        ok, frame = cap.read()
+        position += 1
+        if not ok:
+            break
+        buffer.fill(frame, decoded)
+        decoded += 1
+    cap.release()
+    return np.asarray(indices[:decoded]), buffer.batch[:decoded]
+
+
+def analyze(path, sample_fps=2.0, workers=None):
+    """Returns one row per sampled frame: time, focus score and direction scores."""
+    frame_count, fps = video_info(path)
+    step = max(fps / sample_fps, 1.0)
+    indices = np.unique(np.round(np.arange(0, frame_count, step)).astype(np.int64))
+    segments = [(path, indices[start:start + SEGMENT_FRAMES]) for start in range(0, len(indices), SEGMENT_FRAMES)]
+
+    predict = load_session_model()
+    times, scores = [], []
+    # Workers are started on the first submit, after TensorFlow has loaded; forking its threads can deadlock
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        for segment_indices, batch in pool.map(decode_segment, segments):
+            if len(batch):
+                times.append(segment_indices / fps)
+                scores.append(np.asarray(predict(batch)))
+
+    if not scores:
+        raise ValueError(f'No frames decoded from {path}')
+    scores = np.concatenate(scores)
+    frames = pd.DataFrame(scores[:, 1:], columns=directions)
+    frames.insert(0, 'focus_score', scores[:, 0])
+    frames.insert(0, 'time_s', np.concatenate(times))
+    return frames, frame_count / fps
+
+
+def per_second_timeline(frames):
+    """Aggregates sampled frames into one row per second of video."""
+    frames = frames.assign(second=frames['time_s'].astype(int), focused=frames['focus_score'] > 0.5,
+                           direction=np.asarray(directions)[frames[directions].to_numpy().argmax(axis=1)])
+    grouped = frames.groupby('second')
+    timeline = pd.DataFrame({
+        'frames': grouped.size(),
+        'focus_ratio': grouped['focused'].mean().round(4),
+        'mean_focus_score': grouped['focus_score'].mean().round(4),
+        'direction': grouped['direction'].agg(lambda d: d.value_counts().idxmax()),
+    })
+    # Share of sampled frames facing each way
+    shares = pd.crosstab(frames['second'], frames['direction'], normalize='index')
+    shares = shares.reindex(columns=directions, fill_value=0.0).round(4).add_prefix('share_')
+    return timeline.join(shares).reset_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('video')
+    parser.add_argument('--fps', type=float, default=2.0, help='frames analysed per second of video')
+    parser.add_argument('--workers', type=int, default=None, help='decoder processes (default: one per CPU)')
+    parser.add_argument('--output', help='timeline file, .csv or .parquet (default: <video>.timeline.csv)')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    frames, duration = analyze(args.video, args.fps, args.workers)
+    timeline = per_second_timeline(frames)
+    output = args.output or os.path.splitext(args.video)[0] + '.timeline.csv'
+    if output.endswith('.parquet'):
+        timeline.to_parquet(output, index=False)
+    else:
+        timeline.to_csv(output, index=False)
+    elapsed = time.perf_counter() - started
+
+    print(f"{args.video}: {duration:.1f} s of video, {len(frames)} frames analysed in {elapsed:.1f} s "
+          f"({duration / elapsed:.1f} video-s per wall-s)")
+    print(f"Overall focus {np.mean(frames['focus_score'] > 0.5):.0%}; timeline written to {output}")
+
+
+if __name__ == '__main__':
+    main()
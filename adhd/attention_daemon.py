@@ -0,0 +1,156 @@
+"""Headless realtime attention service publishing focus/direction events.
+
+Runs the fused eye-focus + face-direction pipeline (RealtimeSession.py) on the
+camera without a window, behind the change gate, and publishes the latest
+state --rate times per second as one compact JSON object per line to every
+subscriber of a local TCP port or Unix socket:
+
+    {"t": 1718000000.5, "seq": 412, "focus": 1, "score": 0.87, "dir": "left", "ratio": 0.78, "fps": 14.9}
+
+`seq` is the number of frames scored so far (unchanged if no new frame was
+scored since the last event), and `ratio` is the focus ratio over the last
+--window-s seconds of events. Subscribers just read lines, e.g.
+`nc 127.0.0.1 5012`; one that falls behind is disconnected instead of
+slowing the others down.
+
+    python attention_daemon.py --rate 2 --port 5012
+    python attention_daemon.py --unix /tmp/attention.sock --source video:session.mp4
+"""
+import argparse
+import json
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from adhd.focus_sessions import FocusWindow
+from adhd.frame_sources import add_source_arguments, open_source
+from adhd.realtime import CHANGE_THRESHOLD, INFERENCE_STRIDE, ChangeGate, RealtimePipeline
+from adhd.RealtimeSession import SessionScorer, load_session_model
+
+# Default TCP port of the event stream
+EVENTS_PORT = int(os.environ.get('ATTENTION_EVENTS_PORT', 5012))
+# Seconds a subscriber may block one event before it is dropped
+SEND_TIMEOUT = 0.05
+
+logger = logging.getLogger(__name__)
+
+
+class EventPublisher:
+    """Accepts subscribers on a local socket and writes every published event to all of them."""
+
+    def __init__(self, host='127.0.0.1', port=EVENTS_PORT, unix_path=None):
+        if unix_path:
+            if os.path.exists(unix_path):
+                os.unlink(unix_path)
+            self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.server.bind(unix_path)
+        else:
+            self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.server.bind((host, port))
+        self.server.listen()
+        self.address = unix_path or self.server.getsockname()
+        self.unix_path = unix_path
+
+        self._clients = []
+        self._lock = threading.Lock()
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                client, _ = self.server.accept()
+            except OSError:
+                return  # server closed
+            client.settimeout(SEND_TIMEOUT)
+            with self._lock:
+                self._clients.append(client)
+            logger.info("Subscriber connected (%d total)", len(self._clients))
+
+    def publish(self, event):
+        line = (json.dumps(event, separators=(',', ':')) + '\n').encode()
+        with self._lock:
+            clients = list(self._clients)
+        for client in clients:
+            try:
+                client.sendall(line)
+            except OSError:
+                # Gone, or too slow to take an event within SEND_TIMEOUT
+                client.close()
+                with self._lock:
+                    self._clients.remove(client)
+                logger.info("Subscriber dropped (%d left)", len(self._clients))
+
+    def close(self):
+        self.server.close()
+        with self._lock:
+            for client in self._clients:
+                client.close()
+            self._clients = []
+        if self.unix_path and os.path.exists(self.unix_path):
+            os.unlink(self.unix_path)
+
+
+def publish_loop(pipeline, scorer, publisher, rate, window_s):
+    """Publishes the pipeline's newest record `rate` times per second until it stops."""
+    interval = 1.0 / rate
+    window = FocusWindow(max(1, round(window_s * rate)))
+    next_event = time.monotonic()
+    while not pipeline.stopped.wait(max(0.0, next_event - time.monotonic())):
+        next_event += interval
+        record = pipeline.result
+        if record is None:
+            continue
+        focused = record['focus'] == "Focus"
+        window.add(focused)
+        publisher.publish({
+            't': round(time.time(), 3),
+            'seq': scorer.frames,
+            'focus': int(focused),
+            'score': record['focus_score'],
+            'dir': record['direction'],
+            'ratio': round(window.ratio(), 3),
+            'fps': round(pipeline.inference_rate.rate(), 1),
+        })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_source_arguments(parser)
+    parser.add_argument('--rate', type=float, default=2.0, help='events published per second')
+    parser.add_argument('--window-s', type=float, default=30.0, help='seconds in the rolling focus ratio')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=EVENTS_PORT)
+    parser.add_argument('--unix', help='publish on this Unix socket path instead of TCP')
+    parser.add_argument('--stride', type=int, default=INFERENCE_STRIDE, help='score every Nth captured frame')
+    parser.add_argument('--change-threshold', type=float, default=CHANGE_THRESHOLD,
+                        help='reuse the last result while the frame changed less than this (0 disables)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+    scorer = SessionScorer(load_session_model())
+    publisher = EventPublisher(args.host, args.port, args.unix)
+    logger.info("Publishing attention events on %s at %.1f/s", publisher.address, args.rate)
+
+    # Always headless: the daemon never opens a window, whatever --headless says
+    pipeline = RealtimePipeline(open_source(args.source), ChangeGate(scorer, threshold=args.change_threshold),
+                                stride=args.stride, headless=True, duration=args.duration)
+    publisher_thread = threading.Thread(
+        target=publish_loop, args=(pipeline, scorer, publisher, args.rate, args.window_s), daemon=True)
+    publisher_thread.start()
+    try:
+        pipeline.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pipeline.stopped.set()
+        publisher_thread.join(timeout=1)
+        publisher.close()
+
+
+if __name__ == '__main__':
+    main()
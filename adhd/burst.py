@@ -0,0 +1,74 @@
+"""Reading and decoding of multi-frame bursts for /predict/burst.
+
+A burst is the 20-50 frames the app captures during an activity, sent in one
+request either as repeated multipart file fields or as one zip archive. All
+frames are decoded and preprocessed in parallel straight into the rows of one
+float32 batch, which then goes through the eye model in a single forward pass.
+"""
+import io
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from adhd.preprocessing import MODEL_SIZE, preprocess_frame
+
+# Frames accepted per burst, and total uncompressed bytes accepted from a zip
+BURST_MAX_FRAMES = int(os.environ.get('BURST_MAX_FRAMES', 64))
+BURST_MAX_BYTES = int(os.environ.get('BURST_MAX_BYTES', 64 * 1024 * 1024))
+# Threads decoding frames (cv2.imdecode and cv2.resize release the GIL)
+BURST_DECODE_WORKERS = int(os.environ.get('BURST_DECODE_WORKERS', min(8, os.cpu_count() or 1)))
+
+decode_pool = ThreadPoolExecutor(max_workers=BURST_DECODE_WORKERS, thread_name_prefix='burst-decode')
+
+
+def read_zip(data):
+    """Returns (name, bytes) of every file in a zip archive, in name order."""
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(data))
+    except zipfile.BadZipFile:
+        raise ValueError('Invalid zip archive')
+    with archive:
+        members = sorted((info for info in archive.infolist() if not info.is_dir()), key=lambda info: info.filename)
+        if len(members) > BURST_MAX_FRAMES:
+            raise ValueError(f'At most {BURST_MAX_FRAMES} frames per burst')
+        if sum(info.file_size for info in members) > BURST_MAX_BYTES:
+            raise ValueError(f'Burst larger than {BURST_MAX_BYTES} bytes uncompressed')
+        return [(info.filename, archive.read(info)) for info in members]
+
+
+def read_burst(request):
+    """Returns the (name, bytes) frames of a burst request, in the order they were sent."""
+    uploads = [upload for _, upload in request.files.items(multi=True)]
+    if len(uploads) == 1 and (uploads[0].filename or '').lower().endswith('.zip'):
+        return read_zip(uploads[0].read())
+    if not uploads and request.mimetype in ('application/zip', 'application/x-zip-compressed'):
+        return read_zip(request.get_data())
+    if len(uploads) > BURST_MAX_FRAMES:
+        raise ValueError(f'At most {BURST_MAX_FRAMES} frames per burst')
+    return [(upload.filename or str(i), upload.read()) for i, upload in enumerate(uploads)]
+
+
+def _decode_into(batch, index, data):
+    if not data:  # imdecode asserts on an empty buffer instead of returning None
+        return False
+    image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        return False
+    preprocess_frame(image, out=batch[index])
+    return True
+
+
+def decode_burst(frames):
+    """Decodes frames in parallel into one (N, 64, 64, 3) float32 batch.
+
+    Returns the batch of the frames that decoded and a per-frame mask of which did.
+    """
+    batch = np.empty((len(frames), MODEL_SIZE, MODEL_SIZE, 3), dtype=np.float32)
+    valid = np.fromiter(
+        decode_pool.map(lambda item: _decode_into(batch, item[0], item[1][1]), enumerate(frames)),
+        dtype=bool, count=len(frames),
+    )
+    return batch[valid] if not valid.all() else batch, valid
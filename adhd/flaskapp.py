@@ -1,40 +1,172 @@
+import logging
+import os
+import queue
+import sys
+import time
 from flask import Flask, request, jsonify
 import numpy as np
-from tensorflow.keras.models import load_model
-from PIL import Image
-import cv2
-import io
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from adhd.activity import FEATURES, score_sessions
+from adhd.burst import decode_burst, read_burst
+from adhd.focus_sessions import FocusSessions
+from adhd.preprocessing import FrameBuffer
+from common.batching import MicroBatcher
+from common.model_registry import registry
+from common.readiness import serve_readiness
+from common.result_cache import add_cache_routes, decode_upload
 
 app = Flask(__name__)
 
-# Load the pre-trained Keras model
-best_model = load_model('detection.h5')
+# Load and warm up the models in the background; /ready reports when done
+serve_readiness(app, ['eye_focus'])
+
+# Micro-batching: run one forward pass once N frames are queued or the oldest has waited T ms
+BATCH_MAX_SIZE = int(os.environ.get('BATCH_MAX_SIZE', 16))
+BATCH_MAX_WAIT_MS = float(os.environ.get('BATCH_MAX_WAIT_MS', 5))
+
+def predict_batch(batch):
+    best_model = registry.get('eye_focus')
+    result = best_model.predict_on_batch(batch)
+    return np.asarray(result)[:, 0]  # Assuming single output node
+
+batcher = MicroBatcher(predict_batch, max_batch_size=BATCH_MAX_SIZE, max_wait_ms=BATCH_MAX_WAIT_MS)
+
+cache = add_cache_routes(app)
+
+# Running focus statistics of activity sessions, fed by /predict and /stream
+sessions = FocusSessions()
+
+# Preprocessing buffers reused across requests; a request holds one until its batch has run
+frame_buffers = queue.SimpleQueue()
 
-def preprocess_image(image):
-    resized_img = image.resize((64, 64))
-    rgb_img = resized_img.convert('RGB')
-    np_img = np.array(rgb_img)
-    normalized_img = np_img / 255.0
-    return normalized_img
+def score_frame(frame):
+    try:
+        buffer = frame_buffers.get_nowait()
+    except queue.Empty:
+        buffer = FrameBuffer()
+    try:
+        return batcher.submit(buffer.fill(frame))
+    finally:
+        frame_buffers.put(buffer)
 
-def predict_image(image):
-    preprocessed_img = preprocess_image(image)
-    preprocessed_img = np.expand_dims(preprocessed_img, axis=0)
-    preprocessed_img = preprocessed_img.reshape(1, 64, 64, 3)
-    result = best_model.predict(preprocessed_img)
-    return result[0][0]  # Assuming single output node
+def predict_image(data):
+    return float(score_frame(decode_upload(data)))
 
 @app.route('/predict', methods=['POST'])
 def predict():
     if 'file' not in request.files:
         return jsonify({'error': 'No file provided'}), 400
-    
+
     file = request.files['file']
-    image = Image.open(io.BytesIO(file.read()))
-    prediction = predict_image(image)
+    try:
+        prediction = cache.get_or_compute_upload(file.read(), ['eye_focus'], predict_image)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     result = "Focus" if prediction > 0.5 else "Not Focus"
-    
+
+    # Frames sent during an activity count towards its Eye Tracking feature
+    if request.form.get('session'):
+        sessions.record(request.form['session'], prediction)
+
     return jsonify({'prediction': result})
 
+@app.route('/predict/burst', methods=['POST'])
+def predict_burst():
+    """Scores a burst of frames (repeated multipart files, or one zip) in one batched forward pass."""
+    started = time.perf_counter()
+    try:
+        frames = read_burst(request)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if not frames:
+        return jsonify({'error': 'No frames provided'}), 400
+
+    batch, valid = decode_burst(frames)
+    decoded = time.perf_counter()
+    scores = predict_batch(batch) if len(batch) else np.zeros(0, dtype=np.float32)
+    inferred = time.perf_counter()
+
+    results = []
+    valid_scores = iter(scores.tolist())
+    for (name, _), ok in zip(frames, valid):
+        if not ok:
+            results.append({'name': name, 'error': 'Invalid image'})
+            continue
+        score = next(valid_scores)
+        results.append({'name': name, 'score': round(score, 4), 'prediction': "Focus" if score > 0.5 else "Not Focus"})
+
+    # Frames sent during an activity count towards its Eye Tracking feature
+    if request.form.get('session'):
+        for score in scores.tolist():
+            sessions.record(request.form['session'], score)
+
+    focus_percentage = float(np.mean(scores > 0.5) * 100) if len(scores) else 0.0
+    return jsonify({
+        'frames': results,
+        'count': len(frames),
+        'scored': len(scores),
+        'focus_percentage': round(focus_percentage, 2),
+        'prediction': "Focus" if focus_percentage >= 50 else "Not Focus",
+        'timing_ms': {
+            'decode': round((decoded - started) * 1000, 2),
+            'inference': round((inferred - decoded) * 1000, 2),
+            'total': round((time.perf_counter() - started) * 1000, 2),
+        },
+    })
+
+# Persistent focus-tracking stream; needs the optional flask-sock package
+try:
+    from flask_sock import Sock
+except ImportError:
+    Sock = None
+    logging.getLogger(__name__).warning("flask-sock is not installed; /stream is disabled")
+
+if Sock is not None:
+    from adhd.streaming import STREAM_WINDOW, FocusStream
+
+    sock = Sock(app)
+
+    @sock.route('/stream')
+    def stream(ws):
+        session_id = request.args.get('session')
+        on_score = (lambda score: sessions.record(session_id, score)) if session_id else None
+        window = request.args.get('window', type=int) or STREAM_WINDOW
+        FocusStream(ws, score_frame, window=window, on_score=on_score).run()
+
+@app.route('/sessions/<session_id>', methods=['GET'])
+def session_summary(session_id):
+    aggregator = sessions.get(session_id)
+    if aggregator is None:
+        return jsonify({'error': 'Unknown session'}), 404
+    return jsonify(dict(aggregator.summary(), eye_tracking=aggregator.eye_tracking()))
+
+@app.route('/sessions/<session_id>/finish', methods=['POST'])
+def finish_session(session_id):
+    """Ends an activity: derives Eye Tracking from the session's frames and scores it with the activity model.
+
+    The body carries the other activity fields (JSON or form), e.g.
+    {"differences_of_two_pictures": 5, "time_taken_to_find_the_object": 30, "find_the_object": "Yes"}.
+    """
+    aggregator = sessions.get(session_id)
+    if aggregator is None:
+        return jsonify({'error': 'Unknown session'}), 404
+
+    fields = request.get_json(silent=True) or request.form.to_dict()
+    activity = {field: fields[field] for field in FEATURES if field in fields and field != 'eye_tracking'}
+    activity['eye_tracking'] = aggregator.eye_tracking()
+    try:
+        prediction = score_sessions([activity])[0]
+    except (KeyError, ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Only a scored session ends; after a bad request the client can retry with its frames intact
+    sessions.pop(session_id)
+    return jsonify({'prediction': prediction, 'eye_tracking': activity['eye_tracking'], 'focus': aggregator.summary()})
+
+@app.route('/batching/stats', methods=['GET'])
+def batching_stats():
+    return jsonify(batcher.stats())
+
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5001)
\ No newline at end of file
+    app.run(debug=True, host='0.0.0.0', port=5001)
@@ -1,37 +1,48 @@
-import joblib
+import io
+import os
+import sys
 import pandas as pd
 from flask import Flask, request, jsonify
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from adhd.activity import DEFAULTS, score_session, score_sessions
+from common.readiness import serve_readiness
+
 app = Flask(__name__)
 
-# Load the saved model and encoder
-loaded_model = joblib.load('Logistic Regression_model.pkl')
-loaded_encoder = joblib.load('label_encoder.pkl')
+# Load and warm up the models in the background; /ready reports when done
+serve_readiness(app, ['adhd_activity', 'adhd_activity_encoder'])
 
 @app.route('/predict', methods=['GET'])
 def predict():
     try:
         # Get input parameters from request
-        differences_of_two_pictures = int(request.args.get('differences_of_two_pictures', 5))
-        time_taken_to_find_the_object = int(request.args.get('time_taken_to_find_the_object', 30))
-        find_the_object = request.args.get('find_the_object', 'Yes')
-        eye_tracking = request.args.get('eye_tracking', 'Focus')
-        
-        # Create a DataFrame for the input
-        new_data = pd.DataFrame({
-            'Differences of Two Pictures': [differences_of_two_pictures],
-            'Time Taken to Find the Object': [time_taken_to_find_the_object],
-            'Find the Object': [find_the_object],
-            'Eye Tracking': [eye_tracking]
-        })
-        
-        # Predict using the loaded model
-        new_data_encoded = loaded_model.predict(new_data)
-        predicted_class = loaded_encoder.inverse_transform(new_data_encoded)
-        
-        return jsonify({'prediction': predicted_class[0]})
+        session = {field: request.args.get(field, default) for field, default in DEFAULTS.items()}
+
+        # One-row frame built directly; only the model call is shared with the batch path
+        return jsonify({'prediction': score_session(session)})
     except Exception as e:
         return jsonify({'error': str(e)})
 
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    """Scores many sessions at once, sent as JSON (a list, or {"sessions": [...]}) or as CSV."""
+    try:
+        if request.is_json:
+            sessions = request.get_json()
+            if isinstance(sessions, dict):
+                sessions = sessions.get('sessions', [])
+        elif 'file' in request.files:
+            sessions = pd.read_csv(request.files['file'])
+        else:
+            sessions = pd.read_csv(io.BytesIO(request.get_data()))
+
+        # One vectorized predict call for the whole batch, labels in input order
+        predictions = score_sessions(sessions)
+
+        return jsonify({'predictions': predictions, 'count': len(predictions)})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5002)
\ No newline at end of file
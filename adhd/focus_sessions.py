@@ -0,0 +1,165 @@
+"""Running focus statistics of eye-model predictions, per activity session.
+
+While a child plays FindTheObject, every frame the eye model scores for a
+session is folded into a `FocusAggregator` in O(1): counts, score sum, current
+and longest streaks, and a ring buffer of fixed-length time buckets for the
+focus timeline. When the activity ends, the session's `Eye Tracking` feature
+is derived from these statistics and the activity classifier is called
+directly, so no frame is ever re-sent or re-scored.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+import numpy as np
+
+# Seconds per timeline bucket, and how many buckets the ring buffer keeps
+FOCUS_BUCKET_SECONDS = float(os.environ.get('FOCUS_BUCKET_SECONDS', 5))
+FOCUS_BUCKETS = int(os.environ.get('FOCUS_BUCKETS', 120))
+# Share of focused frames at or above which a session's Eye Tracking is 'Focus'
+EYE_TRACKING_FOCUS_RATIO = float(os.environ.get('EYE_TRACKING_FOCUS_RATIO', 0.5))
+# Open sessions kept, and seconds without frames after which a session is dropped
+FOCUS_MAX_SESSIONS = int(os.environ.get('FOCUS_MAX_SESSIONS', 1000))
+FOCUS_SESSION_TTL = float(os.environ.get('FOCUS_SESSION_TTL', 3600))
+
+
+class FocusWindow:
+    """Focus ratio over the last `size` frames, updated in O(1)."""
+
+    def __init__(self, size):
+        self._frames = deque(maxlen=size)
+        self._focused = 0
+
+    def add(self, focused):
+        if len(self._frames) == self._frames.maxlen:
+            self._focused -= self._frames[0]
+        self._frames.append(focused)
+        self._focused += focused
+
+    def ratio(self):
+        return self._focused / len(self._frames) if self._frames else 0.0
+
+    def __len__(self):
+        return len(self._frames)
+
+
+class FocusAggregator:
+    """O(1)-per-frame statistics of one session's focus predictions."""
+
+    def __init__(self, bucket_seconds=FOCUS_BUCKET_SECONDS, buckets=FOCUS_BUCKETS, now=None):
+        self.bucket_seconds = bucket_seconds
+        self.started = time.monotonic() if now is None else now
+        self.updated = self.started
+        self.frames = 0
+        self.focused = 0
+        self.score_sum = 0.0
+        self.streak = 0  # length of the current run; positive while focused, negative while not
+        self.longest_focus_streak = 0
+        self.longest_unfocus_streak = 0
+
+        # Ring buffer of time buckets; slot i holds bucket number bucket_ids[i]
+        self._bucket_ids = np.full(buckets, -1, dtype=np.int64)
+        self._bucket_frames = np.zeros(buckets, dtype=np.int64)
+        self._bucket_focused = np.zeros(buckets, dtype=np.int64)
+        self._lock = threading.Lock()
+
+    def add(self, score, now=None):
+        now = time.monotonic() if now is None else now
+        focused = score > 0.5
+        bucket = int((now - self.started) // self.bucket_seconds)
+        slot = bucket % len(self._bucket_ids)
+
+        with self._lock:
+            self.updated = now
+            self.frames += 1
+            self.focused += focused
+            self.score_sum += score
+
+            if focused:
+                self.streak = self.streak + 1 if self.streak > 0 else 1
+                self.longest_focus_streak = max(self.longest_focus_streak, self.streak)
+            else:
+                self.streak = self.streak - 1 if self.streak < 0 else -1
+                self.longest_unfocus_streak = max(self.longest_unfocus_streak, -self.streak)
+
+            if self._bucket_ids[slot] != bucket:
+                self._bucket_ids[slot] = bucket
+                self._bucket_frames[slot] = 0
+                self._bucket_focused[slot] = 0
+            self._bucket_frames[slot] += 1
+            self._bucket_focused[slot] += focused
+
+    def focus_ratio(self):
+        return self.focused / self.frames if self.frames else 0.0
+
+    def eye_tracking(self, threshold=EYE_TRACKING_FOCUS_RATIO):
+        """The activity model's `Eye Tracking` value for this session."""
+        return 'Focus' if self.focus_ratio() >= threshold else 'Not'
+
+    def timeline(self):
+        """Focus ratio of every bucket still in the ring buffer, oldest first."""
+        with self._lock:
+            used = np.flatnonzero(self._bucket_ids >= 0)
+            order = used[np.argsort(self._bucket_ids[used])]
+            return [
+                {
+                    'start_s': round(float(self._bucket_ids[i] * self.bucket_seconds), 3),
+                    'frames': int(self._bucket_frames[i]),
+                    'focus_ratio': round(float(self._bucket_focused[i] / self._bucket_frames[i]), 4),
+                }
+                for i in order
+            ]
+
+    def summary(self):
+        with self._lock:
+            summary = {
+                'frames': self.frames,
+                'focused_frames': self.focused,
+                'focus_ratio': round(self.focus_ratio(), 4),
+                'mean_score': round(self.score_sum / self.frames, 4) if self.frames else 0.0,
+                'current_streak': self.streak,
+                'longest_focus_streak': self.longest_focus_streak,
+                'longest_unfocus_streak': self.longest_unfocus_streak,
+                'duration_s': round(self.updated - self.started, 3),
+            }
+        summary['timeline'] = self.timeline()
+        return summary
+
+
+class FocusSessions:
+    """Open sessions by id; the least recently updated are dropped past the limit or TTL."""
+
+    def __init__(self, max_sessions=FOCUS_MAX_SESSIONS, ttl=FOCUS_SESSION_TTL):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions = OrderedDict()  # id -> FocusAggregator, least recently updated first
+        self._lock = threading.Lock()
+
+    def record(self, session_id, score):
+        now = time.monotonic()
+        with self._lock:
+            aggregator = self._sessions.get(session_id)
+            if aggregator is None:
+                aggregator = self._sessions[session_id] = FocusAggregator(now=now)
+            self._sessions.move_to_end(session_id)
+            self._expire(now)
+        aggregator.add(score, now)
+
+    def get(self, session_id):
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def pop(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None)
+
+    def _expire(self, now):
+        while self._sessions:
+            session_id, aggregator = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.max_sessions and now - aggregator.updated < self.ttl:
+                break
+            del self._sessions[session_id]
+
+    def __len__(self):
+        return len(self._sessions)
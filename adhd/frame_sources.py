@@ -0,0 +1,144 @@
+"""Frame sources for the realtime scripts.
+
+Every source has the `read() -> (ok, frame)` / `release()` interface of
+cv2.VideoCapture, so RealtimePipeline runs the same on a webcam, a recorded
+video, a directory of images or generated frames, e.g. on a headless CI box.
+`open_source` builds one from a command-line spec:
+
+    0, webcam:1           webcam index
+    video:session.mp4     video file (any path with a video extension works too)
+    dir:frames/           images in a directory, in name order
+    synthetic:320x240     generated frames; "synthetic:320x240@15" paces them at 15 fps
+"""
+import os
+import time
+
+import cv2
+import numpy as np
+
+from adhd.preprocessing import CAPTURE_HEIGHT, CAPTURE_WIDTH, open_camera
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.webm')
+
+
+class Pacer:
+    """Sleeps so that successive calls happen at most `fps` times per second (0 = unpaced)."""
+
+    def __init__(self, fps):
+        self.interval = 1.0 / fps if fps else 0.0
+        self._next = None
+
+    def wait(self):
+        if not self.interval:
+            return
+        now = time.monotonic()
+        if self._next is not None and now < self._next:
+            time.sleep(self._next - now)
+            now = self._next
+        self._next = now + self.interval
+
+
+class VideoSource:
+    """A video file, optionally looped and paced at its native frame rate like a live camera."""
+
+    def __init__(self, path, loop=False, realtime=True):
+        self.path = path
+        self.loop = loop
+        self.capture = cv2.VideoCapture(path)
+        if not self.capture.isOpened():
+            raise ValueError(f'Cannot open video: {path}')
+        self.pacer = Pacer(self.capture.get(cv2.CAP_PROP_FPS) if realtime else 0)
+
+    def read(self):
+        self.pacer.wait()
+        ok, frame = self.capture.read()
+        if not ok and self.loop:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.capture.read()
+        return ok, frame
+
+    def release(self):
+        self.capture.release()
+
+
+class ImageDirectorySource:
+    """The images in a directory, in name order, decoded once and replayed at `fps`."""
+
+    def __init__(self, path, fps=30, loop=True):
+        names = sorted(name for name in os.listdir(path) if name.lower().endswith(IMAGE_EXTENSIONS))
+        self.frames = [frame for frame in (cv2.imread(os.path.join(path, name)) for name in names) if frame is not None]
+        if not self.frames:
+            raise ValueError(f'No images in {path}')
+        self.loop = loop
+        self.pacer = Pacer(fps)
+        self.index = 0
+
+    def read(self):
+        if self.index >= len(self.frames):
+            if not self.loop:
+                return False, None
+            self.index = 0
+        self.pacer.wait()
+        frame = self.frames[self.index]
+        self.index += 1
+        return True, frame
+
+    def release(self):
+        self.frames = []
+
+
+class SyntheticSource:
+    """Generated frames: a fixed noise image with a bright square that moves by `motion` pixels per frame.
+
+    `motion=0` gives a static scene (what the change gate skips); `frames=None` runs until released.
+    """
+
+    def __init__(self, width=CAPTURE_WIDTH, height=CAPTURE_HEIGHT, fps=30, frames=None, motion=4, seed=0):
+        self.background = np.random.default_rng(seed).integers(0, 256, (height, width, 3), dtype=np.uint8)
+        self.size = max(8, min(width, height) // 4)
+        self.motion = motion
+        self.frames = frames
+        self.pacer = Pacer(fps)
+        self.index = 0
+
+    def read(self):
+        if self.frames is not None and self.index >= self.frames:
+            return False, None
+        self.pacer.wait()
+        frame = self.background.copy()
+        height, width = frame.shape[:2]
+        x = (self.index * self.motion) % max(1, width - self.size)
+        y = (height - self.size) // 2
+        frame[y:y + self.size, x:x + self.size] = 255
+        self.index += 1
+        return True, frame
+
+    def release(self):
+        self.frames = 0
+
+
+def open_source(spec):
+    """Opens a frame source from a spec such as '0', 'video:clip.mp4', 'dir:frames/' or 'synthetic:320x240@30'."""
+    kind, _, value = spec.partition(':')
+    if kind not in ('webcam', 'video', 'dir', 'synthetic'):
+        # A bare index or path (which may itself contain ':', like C:\clip.mp4)
+        kind, value = '', spec
+    if kind == 'webcam' or (not kind and value.isdigit()):
+        return open_camera(int(value or 0))
+    if kind == 'video' or (not kind and value.lower().endswith(VIDEO_EXTENSIONS)):
+        return VideoSource(value)
+    if kind == 'dir' or (not kind and os.path.isdir(value)):
+        return ImageDirectorySource(value)
+    if kind == 'synthetic' or value == 'synthetic':
+        size, _, fps = (value if kind else '').partition('@')
+        width, _, height = size.partition('x')
+        return SyntheticSource(int(width or CAPTURE_WIDTH), int(height or CAPTURE_HEIGHT), fps=float(fps or 30))
+    raise ValueError(f'Unknown frame source: {spec}')
+
+
+def add_source_arguments(parser):
+    """Adds the --source / --headless / --duration options shared by the realtime scripts."""
+    parser.add_argument('--source', default='0', help="webcam index, 'video:PATH', 'dir:PATH' or 'synthetic[:WxH@FPS]'")
+    parser.add_argument('--headless', action='store_true', help='no window; log FPS and latency only')
+    parser.add_argument('--duration', type=float, default=None, help='stop after this many seconds')
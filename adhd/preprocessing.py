@@ -0,0 +1,70 @@
+"""Frame preprocessing for the eye-focus and face-direction models.
+
+Frames go straight from OpenCV's BGR uint8 array to the models' normalized RGB
+float32 64x64 input: one resize into a reused scratch buffer, then one
+channel swap and scale written in place into a preallocated batch. There is no
+PIL round trip and no float64 intermediate.
+"""
+import os
+
+import cv2
+import numpy as np
+
+# Input size of both models
+MODEL_SIZE = 64
+
+# Capture resolution requested from the webcam; the models only need 64x64
+CAPTURE_WIDTH = int(os.environ.get('CAPTURE_WIDTH', 320))
+CAPTURE_HEIGHT = int(os.environ.get('CAPTURE_HEIGHT', 240))
+
+SCALE = np.float32(1.0 / 255.0)
+
+
+class FrameBuffer:
+    """Preallocated (batch_size, 64, 64, 3) float32 model input, filled in place from BGR frames.
+
+    Not thread-safe: give each thread that preprocesses frames its own buffer.
+    """
+
+    def __init__(self, batch_size=1, size=MODEL_SIZE):
+        self.size = size
+        self.batch = np.empty((batch_size, size, size, 3), dtype=np.float32)
+        self._resized = np.empty((size, size, 3), dtype=np.uint8)
+
+    def fill(self, frame, index=0):
+        """Writes the model input for a BGR frame into row `index` of the batch and returns that row."""
+        # INTER_AREA averages source pixels, like PIL's antialiased downscale did
+        cv2.resize(frame, (self.size, self.size), dst=self._resized, interpolation=cv2.INTER_AREA)
+        # BGR -> RGB via a reversed channel view, cast and normalized in place in the batch
+        row = self.batch[index]
+        row[...] = self._resized[..., ::-1]
+        row *= SCALE
+        return row
+
+    def fill_one(self, frame):
+        """Fills row 0 and returns it as a batch of one."""
+        self.fill(frame)
+        return self.batch[:1]
+
+
+def preprocess_frame(frame, out=None, size=MODEL_SIZE):
+    """Writes the (64, 64, 3) float32 model input for a BGR frame into `out` (allocated if None) and returns it.
+
+    Safe to call from several threads at once, e.g. to fill rows of one batch in parallel.
+    """
+    resized = cv2.resize(frame, (size, size), interpolation=cv2.INTER_AREA)
+    if out is None:
+        out = np.empty((size, size, 3), dtype=np.float32)
+    out[...] = resized[..., ::-1]
+    out *= SCALE
+    return out
+
+
+def open_camera(index=0, width=CAPTURE_WIDTH, height=CAPTURE_HEIGHT):
+    """Opens a webcam at a capture resolution close to what the models need."""
+    cap = cv2.VideoCapture(index)
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    # Keep the driver from queueing stale frames
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
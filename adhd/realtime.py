@@ -0,0 +1,281 @@
+"""Pipelined realtime engine for the webcam scripts.
+
+Capture, inference and display run on separate threads and hand frames to each
+other through single-slot "latest frame wins" buffers. The displayed frame rate
+is set by the camera rather than by inference latency, and the model always
+sees the freshest frame instead of one that went stale in the driver buffer.
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+# Run the model on every Nth captured frame; the newest result is drawn on every frame
+INFERENCE_STRIDE = int(os.environ.get('INFERENCE_STRIDE', 1))
+# Mean absolute grey-level difference (0-255) below which a frame counts as unchanged; 0 disables the gate
+CHANGE_THRESHOLD = float(os.environ.get('CHANGE_THRESHOLD', 3.0))
+# Consecutive frames that may reuse one prediction before the model runs again regardless
+CHANGE_MAX_REUSE = int(os.environ.get('CHANGE_MAX_REUSE', 15))
+# Seconds between FPS log lines
+FPS_LOG_INTERVAL = float(os.environ.get('FPS_LOG_INTERVAL', 5))
+# Most recent inference latencies kept for the percentiles in stats()
+LATENCY_SAMPLES = 1000
+
+logger = logging.getLogger(__name__)
+
+
+class LatestSlot:
+    """Single-slot handoff between threads: put() overwrites, get() waits for something newer."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._value = None
+        self._seq = 0
+        self.dropped = 0  # values overwritten before anyone read them
+
+    def put(self, value):
+        with self._cond:
+            if self._value is not None:
+                self.dropped += 1
+            self._value = value
+            self._seq += 1
+            self._cond.notify_all()
+
+    def get(self, timeout=None):
+        """Returns the newest value and clears the slot, or None if nothing arrived within `timeout`."""
+        with self._cond:
+            if self._value is None:
+                self._cond.wait(timeout)
+            value, self._value = self._value, None
+            return value
+
+    def wake(self):
+        with self._cond:
+            self._cond.notify_all()
+
+
+class RateMeter:
+    """Events per second over a sliding window."""
+
+    def __init__(self, window=2.0):
+        self.window = window
+        self._times = deque()
+        self.count = 0
+
+    def tick(self):
+        now = time.monotonic()
+        self._times.append(now)
+        self.count += 1
+        while self._times and self._times[0] < now - self.window:
+            self._times.popleft()
+
+    def rate(self):
+        if len(self._times) < 2:
+            return 0.0
+        span = self._times[-1] - self._times[0]
+        return (len(self._times) - 1) / span if span > 0 else 0.0
+
+
+class ChangeGate:
+    """Wraps `predict_fn(frame)` and reuses the last prediction while the scene hasn't changed.
+
+    Each frame is shrunk to a 32x32 grey thumbnail and compared with the
+    thumbnail of the last frame the model actually ran on. Below `threshold`
+    mean absolute difference the previous result is returned; after
+    `max_reuse` reuses in a row the model runs anyway, so slow drift is
+    still picked up.
+    """
+
+    def __init__(self, predict_fn, threshold=CHANGE_THRESHOLD, max_reuse=CHANGE_MAX_REUSE, size=32):
+        self.predict_fn = predict_fn
+        self.threshold = threshold
+        self.max_reuse = max_reuse
+        self.size = size
+
+        self._small = np.empty((size, size, 3), dtype=np.uint8)
+        self._current = np.empty((size, size), dtype=np.uint8)
+        self._reference = np.empty((size, size), dtype=np.uint8)
+        self._diff = np.empty((size, size), dtype=np.uint8)
+        self.result = None
+        self.reused = 0
+        self.frames = 0
+        self.skipped = 0
+        self.last_change = None
+
+    def __call__(self, frame):
+        cv2.resize(frame, (self.size, self.size), dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._current)
+        self.frames += 1
+
+        if self.result is not None and self.reused < self.max_reuse:
+            cv2.absdiff(self._current, self._reference, dst=self._diff)
+            self.last_change = cv2.mean(self._diff)[0]
+            if self.last_change < self.threshold:
+                self.reused += 1
+                self.skipped += 1
+                return self.result
+
+        self.result = self.predict_fn(frame)
+        self.reused = 0
+        self._current, self._reference = self._reference, self._current
+        return self.result
+
+    def stats(self):
+        return {
+            'gate_threshold': self.threshold,
+            'gate_max_reuse': self.max_reuse,
+            'frames_gated': self.frames,
+            'frames_skipped': self.skipped,
+            'skipped_fraction': round(self.skipped / self.frames, 3) if self.frames else 0.0,
+        }
+
+
+class RealtimePipeline:
+    """Runs `predict_fn(frame)` on a camera feed and draws results with `draw_fn(frame, result)`.
+
+    The capture thread reads frames as fast as the camera delivers them and
+    offers every `stride`-th one to the inference thread; the main thread
+    displays the newest frame with the newest result (cv2.imshow must run on
+    the main thread on most platforms). Press 'q' to stop.
+
+    `capture` is a cv2.VideoCapture or any source from adhd/frame_sources.py.
+    With `headless=True` nothing is drawn or shown and the main thread only
+    logs; `duration` stops the run after that many seconds.
+    """
+
+    def __init__(self, capture, predict_fn, draw_fn=None, stride=INFERENCE_STRIDE, window_name='Frame',
+                 headless=False, duration=None):
+        self.capture = capture
+        self.predict_fn = predict_fn
+        self.draw_fn = draw_fn
+        self.stride = max(1, stride)
+        self.window_name = window_name
+        self.headless = headless
+        self.duration = duration
+
+        self.result = None
+        self.stopped = threading.Event()
+        self._display_slot = LatestSlot()
+        self._inference_slot = LatestSlot()
+        self.capture_rate = RateMeter()
+        self.inference_rate = RateMeter()
+        self.display_rate = RateMeter()
+        self.latencies_ms = deque(maxlen=LATENCY_SAMPLES)
+        self.started = None
+        self.cpu_started = None
+
+    def _capture_loop(self):
+        index = 0
+        while not self.stopped.is_set():
+            ret, frame = self.capture.read()
+            if not ret:
+                break
+            self.capture_rate.tick()
+            if index % self.stride == 0:
+                self._inference_slot.put(frame)
+            if not self.headless:
+                self._display_slot.put(frame)
+            index += 1
+        self.stopped.set()
+        self._display_slot.wake()
+        self._inference_slot.wake()
+
+    def _inference_loop(self):
+        while not self.stopped.is_set():
+            frame = self._inference_slot.get(timeout=0.1)
+            if frame is None:
+                continue
+            start = time.perf_counter()
+            try:
+                self.result = self.predict_fn(frame)
+            except Exception:
+                logger.exception("Inference failed")
+                self.stopped.set()
+                break
+            self.latencies_ms.append((time.perf_counter() - start) * 1000.0)
+            self.inference_rate.tick()
+
+    def stats(self):
+        stats = {
+            'capture_fps': round(self.capture_rate.rate(), 1),
+            'inference_fps': round(self.inference_rate.rate(), 1),
+            'display_fps': round(self.display_rate.rate(), 1),
+            'frames_captured': self.capture_rate.count,
+            'frames_inferred': self.inference_rate.count,
+            'inference_frames_dropped': self._inference_slot.dropped,
+        }
+        if self.started is not None:
+            elapsed = time.monotonic() - self.started
+            cpu = os.times()
+            stats['elapsed_s'] = round(elapsed, 2)
+            # Cores kept busy by the whole process (user + system time per wall second)
+            stats['cpu_cores'] = round((cpu.user + cpu.system - self.cpu_started) / elapsed, 2) if elapsed else 0.0
+        latencies = list(self.latencies_ms)
+        if latencies:
+            p50, p95, p99 = np.percentile(latencies, (50, 95, 99)).tolist()
+            stats.update(latency_p50_ms=round(p50, 2), latency_p95_ms=round(p95, 2), latency_p99_ms=round(p99, 2))
+        # e.g. the skipped fraction of a ChangeGate
+        if hasattr(self.predict_fn, 'stats'):
+            stats.update(self.predict_fn.stats())
+        return stats
+
+    def _draw_rates(self, frame):
+        text = f"capture {self.capture_rate.rate():.1f} fps | inference {self.inference_rate.rate():.1f} fps"
+        if isinstance(self.predict_fn, ChangeGate) and self.predict_fn.frames:
+            text += f" | skipped {self.predict_fn.skipped / self.predict_fn.frames:.0%}"
+        cv2.putText(frame, text, (10, frame.shape[0] - 15), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1, cv2.LINE_AA)
+
+    def run(self):
+        threads = [
+            threading.Thread(target=self._capture_loop, daemon=True),
+            threading.Thread(target=self._inference_loop, daemon=True),
+        ]
+        self.started = time.monotonic()
+        cpu = os.times()
+        self.cpu_started = cpu.user + cpu.system
+        for thread in threads:
+            thread.start()
+
+        next_log = self.started + FPS_LOG_INTERVAL
+        deadline = self.started + self.duration if self.duration else None
+        try:
+            while not self.stopped.is_set():
+                if self.headless:
+                    self.stopped.wait(0.1)
+                else:
+                    self._show_latest()
+                    # Break the loop when 'q' is pressed
+                    if cv2.waitKey(1) & 0xFF == ord('q'):
+                        break
+
+                now = time.monotonic()
+                if now >= next_log:
+                    logger.info("%s", self.stats())
+                    next_log += FPS_LOG_INTERVAL
+                if deadline is not None and now >= deadline:
+                    break
+        finally:
+            self.stopped.set()
+            for thread in threads:
+                thread.join(timeout=1)
+            self.capture.release()
+            if not self.headless:
+                cv2.destroyAllWindows()
+            logger.info("Final: %s", self.stats())
+        return self.stats()
+
+    def _show_latest(self):
+        frame = self._display_slot.get(timeout=0.1)
+        if frame is None:
+            return
+        # The inference thread may still be reading this frame, so draw on a copy
+        frame = frame.copy()
+        if self.result is not None and self.draw_fn is not None:
+            self.draw_fn(frame, self.result)
+        self._draw_rates(frame)
+        cv2.imshow(self.window_name, frame)
+        self.display_rate.tick()
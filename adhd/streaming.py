@@ -0,0 +1,145 @@
+"""Per-connection state of the /stream focus-tracking WebSocket.
+
+A client keeps one WebSocket open for a session and sends frames as binary
+messages: encoded images (JPEG/PNG) by default, or raw pixels after a
+`{"format": "raw", "width": W, "height": H, "channels": 3|4}` text message
+(RGB or RGBA rows, as a phone camera delivers them). `{"format": "encoded"}`
+switches back. Every scored frame is answered with one JSON text message:
+
+    {"frame": 12, "prediction": "Focus", "score": 0.91, "focus_ratio": 0.8, "window": 30, "dropped": 3}
+
+With `?session=<id>` every scored frame is also added to that activity
+session's focus statistics (adhd/focus_sessions.py).
+
+The receiving thread only stores the newest frame's bytes; a worker thread
+decodes and scores it. Frames that arrive while the previous one is still
+being scored are replaced, never queued, so a client that sends faster than
+inference keeps up gets answers for the newest frames and `dropped` counts
+the rest.
+"""
+import json
+import logging
+import os
+import threading
+
+import cv2
+import numpy as np
+from simple_websocket import ConnectionClosed
+
+from adhd.focus_sessions import FocusWindow
+from adhd.realtime import LatestSlot
+
+# Frames in the rolling focus ratio
+STREAM_WINDOW = int(os.environ.get('STREAM_WINDOW', 30))
+
+logger = logging.getLogger(__name__)
+
+
+def decode_frame(payload, raw_format=None):
+    """Returns a BGR frame from an encoded image, or from raw RGB/RGBA bytes when `raw_format` is set."""
+    if not payload:
+        raise ValueError('Empty frame')
+    if raw_format is None:
+        image = cv2.imdecode(np.frombuffer(payload, np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError('Invalid image')
+        return image
+
+    width, height, channels = raw_format
+    if len(payload) != width * height * channels:
+        raise ValueError(f'Expected {width * height * channels} bytes for a {width}x{height}x{channels} frame')
+    pixels = np.frombuffer(payload, np.uint8).reshape(height, width, channels)
+    return cv2.cvtColor(pixels, cv2.COLOR_RGBA2BGR if channels == 4 else cv2.COLOR_RGB2BGR)
+
+
+def parse_format(message):
+    """Returns the raw frame layout requested by a text control message, or None for encoded frames."""
+    config = json.loads(message)
+    if not isinstance(config, dict):
+        raise ValueError('Control messages are JSON objects')
+    if config.get('format', 'encoded') == 'encoded':
+        return None
+    if config['format'] != 'raw':
+        raise ValueError(f"Unknown frame format: {config['format']}")
+    raw_format = (int(config['width']), int(config['height']), int(config.get('channels', 3)))
+    if raw_format[2] not in (3, 4) or min(raw_format[:2]) <= 0:
+        raise ValueError('Raw frames need a positive width and height and 3 or 4 channels')
+    return raw_format
+
+
+class FocusStream:
+    """Serves one WebSocket: receives frames, scores the newest with `score_fn(bgr_frame)`, sends results."""
+
+    def __init__(self, ws, score_fn, window=STREAM_WINDOW, on_score=None):
+        self.ws = ws
+        self.score_fn = score_fn
+        self.on_score = on_score  # called with every frame's score, e.g. to aggregate a session
+        self.window = FocusWindow(window)
+        self._slot = LatestSlot()
+        self._closed = threading.Event()
+        self._send_lock = threading.Lock()
+        self.received = 0
+        self.scored = 0
+
+    def _send(self, message):
+        with self._send_lock:
+            self.ws.send(json.dumps(message))
+
+    def _score(self, seq, payload, raw_format):
+        try:
+            score = float(self.score_fn(decode_frame(payload, raw_format)))
+        except ValueError as e:
+            return {'frame': seq, 'error': str(e)}
+
+        focused = score > 0.5
+        self.window.add(focused)
+        self.scored += 1
+        if self.on_score is not None:
+            self.on_score(score)
+        return {
+            'frame': seq,
+            'prediction': "Focus" if focused else "Not Focus",
+            'score': round(score, 4),
+            'focus_ratio': round(self.window.ratio(), 4),
+            'window': len(self.window),
+            'dropped': self._slot.dropped,
+        }
+
+    def _score_loop(self):
+        try:
+            while not self._closed.is_set():
+                item = self._slot.get(timeout=0.1)
+                if item is not None:
+                    self._send(self._score(*item))
+        except ConnectionClosed:
+            pass
+        except Exception:
+            logger.exception("Scoring failed")
+        finally:
+            # Stops the receiving loop too if scoring stopped first
+            self._closed.set()
+
+    def run(self):
+        worker = threading.Thread(target=self._score_loop, daemon=True)
+        worker.start()
+        raw_format = None
+        try:
+            while not self._closed.is_set():
+                message = self.ws.receive(timeout=1)
+                if message is None:
+                    continue
+                if isinstance(message, str):
+                    try:
+                        raw_format = parse_format(message)
+                    except (ValueError, KeyError, TypeError) as e:
+                        self._send({'error': f'Invalid control message: {e}'})
+                    continue
+                self._slot.put((self.received, message, raw_format))
+                self.received += 1
+        except ConnectionClosed:
+            pass
+        finally:
+            self._closed.set()
+            worker.join(timeout=1)
+        logger.info("Stream closed: %d frames received, %d scored, %d dropped",
+                    self.received, self.scored, self._slot.dropped)
@@ -0,0 +1,142 @@
+"""Benchmarks the memory of preparing model inputs in common/handwriting.py.
+
+The legacy paths are the ones the services used before the pooled buffers:
+a list of float64 word images copied with np.array (dysgraphia/flaskapp.py),
+per-word lists of float64 glyphs (dysgraphia/flaskapp2.py), and a list of
+200x200 padded glyphs followed by one float32 batch of the whole page
+(dyslexia/latest_app.py). The pooled path fills MAX_BATCH_SIZE-crop chunks
+of one reused float32 buffer through `crop_batches`.
+
+Each path runs in its own process, up to the point where the model would be
+called, on a dense worksheet segmented once by the parent (so rendering and
+segmenting the page don't set the child's high-water mark). The child's peak
+RSS growth over --requests requests is reported, alongside the tracemalloc
+peak of one more request once the pool is warm.
+
+    python benchmarks/handwriting_memory.py --requests 5
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+from PIL import Image
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from common.handwriting import (LETTER_SIZE, REVERSAL_SIZE, WORD_SIZE, crop_batches, letter_tensors,
+                                preprocess_reversal_glyph, reversal_tensors, word_tensors)
+from common.segmentation import Segmentation, crop, segment_page
+from segmentation import dense_worksheet
+
+
+def legacy_words(segmentation):
+    processed_words = []
+    for box in segmentation.words:
+        word_resized = cv2.resize(crop(segmentation.binary, box), (150, 150))
+        processed_words.append(np.expand_dims(word_resized / 255.0, axis=-1))
+    return np.array(processed_words)
+
+
+def legacy_letters(segmentation):
+    chars_by_word = [[] for _ in range(len(segmentation.words))]
+    for box, word in zip(segmentation.glyph_crops, segmentation.glyph_word):
+        char_img = 255 - cv2.resize(crop(segmentation.glyph_binary, box), (150, 150))
+        chars_by_word[word].append(np.expand_dims(char_img, axis=-1) / 255.0)
+    return [np.array(chars) for chars in chars_by_word]
+
+
+def legacy_reversals(segmentation):
+    char_images = []
+    for box in segmentation.glyph_crops:
+        padded_img = np.ones((200, 200), dtype=np.uint8) * 255
+        padded_img[68:132, 68:132] = 255 - cv2.resize(crop(segmentation.glyph_binary, box), (64, 64))
+        char_images.append(padded_img)
+    batch = np.empty((len(char_images), REVERSAL_SIZE, REVERSAL_SIZE, 3), dtype=np.float32)
+    for i, char_img in enumerate(char_images):
+        preprocess_reversal_glyph(Image.fromarray(char_img), out=batch[i])
+    return batch
+
+
+def pooled(count, item_shape, tensors):
+    def prepare(segmentation):
+        fill = lambda start, out: tensors(segmentation, start, out)
+        for _ in crop_batches(count(segmentation), item_shape, fill):
+            pass  # the model call would go here
+    return prepare
+
+
+PATHS = {
+    ('words', 'legacy'): legacy_words,
+    ('words', 'pooled'): pooled(lambda s: len(s.words), (WORD_SIZE, WORD_SIZE, 1), word_tensors),
+    ('letters', 'legacy'): legacy_letters,
+    ('letters', 'pooled'): pooled(lambda s: len(s.glyphs), (LETTER_SIZE, LETTER_SIZE, 1), letter_tensors),
+    ('reversals', 'legacy'): legacy_reversals,
+    ('reversals', 'pooled'): pooled(lambda s: len(s.glyphs), (REVERSAL_SIZE, REVERSAL_SIZE, 3), reversal_tensors),
+}
+
+
+def peak_rss_mb():
+    # VmHWM starts afresh in the exec'd child; ru_maxrss (the fallback off Linux) keeps the parent's peak
+    try:
+        with open('/proc/self/status') as status:
+            return next(int(line.split()[1]) for line in status if line.startswith('VmHWM:')) / 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (2 ** 20 if sys.platform == 'darwin' else 1024)
+
+
+def run_path(analysis, path, page_file, requests):
+    """Runs one path in this process and prints 'peak_rss_growth_mb traced_peak_mb ms_per_request'."""
+    with np.load(page_file) as page:
+        segmentation = Segmentation(None, page['binary'], None, page['words'], None, page['glyphs'], page['glyph_word'],
+                                    page['glyph_binary'], page['glyph_crops'])
+    prepare = PATHS[analysis, path]
+    baseline = peak_rss_mb()
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        prepare(segmentation)
+    elapsed = (time.perf_counter() - start) * 1000.0 / requests
+    growth = peak_rss_mb() - baseline
+
+    tracemalloc.start()
+    prepare(segmentation)
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{growth:.1f} {traced_peak / 2 ** 20:.1f} {elapsed:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=5)
+    parser.add_argument('--run', nargs=3, metavar=('ANALYSIS', 'PATH', 'PAGE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_path(*args.run, args.requests)
+        return
+
+    segmentation = segment_page(dense_worksheet())
+    page_file = os.path.join(tempfile.mkdtemp(), 'page.npz')
+    np.savez(page_file, binary=segmentation.binary, words=segmentation.words, glyphs=segmentation.glyphs,
+             glyph_word=segmentation.glyph_word, glyph_binary=segmentation.glyph_binary,
+             glyph_crops=segmentation.glyph_crops)
+    print(f"dense worksheet: {len(segmentation.words)} words, {len(segmentation.glyphs)} glyphs, "
+          f"{args.requests} requests per process")
+    for analysis, path in PATHS:
+        command = [sys.executable, __file__, '--requests', str(args.requests), '--run', analysis, path, page_file]
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        growth, traced, elapsed = (float(value) for value in output.split())
+        print(f"  {analysis:10s} {path:7s} peak RSS +{growth:7.1f} MB   traced peak {traced:7.1f} MB/request   "
+              f"{elapsed:7.1f} ms/request")
+
+
+if __name__ == '__main__':
+    main()
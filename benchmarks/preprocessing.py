@@ -0,0 +1,81 @@
+"""Benchmarks adhd/preprocessing.py against the PIL preprocessing it replaced.
+
+The legacy path is the `preprocess_image` + `predict_image` pair from
+RealtimeEye.py / RealtimeFace.py: BGR->RGB, PIL image, resize, back to an
+array, /255 into float64, expand_dims and reshape. The new path fills a
+preallocated float32 batch in place. Both are timed per frame on a 640x480
+frame (the webcam default) and a 320x240 one (the resolution now requested),
+and the bytes allocated per frame are measured with tracemalloc (NumPy and
+PIL buffers; OpenCV writes into the preallocated buffers).
+
+    python benchmarks/preprocessing.py --repeats 2000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+from PIL import Image
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+from adhd.preprocessing import FrameBuffer
+
+
+def legacy_preprocess(frame):
+    pil_img = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    resized_img = pil_img.resize((64, 64))
+    rgb_img = resized_img.convert('RGB')
+    np_img = np.array(rgb_img)
+    normalized_img = np_img / 255.0
+    preprocessed_img = np.expand_dims(normalized_img, axis=0)
+    return preprocessed_img.reshape(1, 64, 64, 3)
+
+
+def time_us(fn, repeats):
+    fn()  # warm-up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1e6)
+    return float(np.median(timings))
+
+
+def allocated_bytes(fn, repeats=100):
+    """Mean peak bytes allocated while preprocessing one frame."""
+    fn()  # warm-up
+    tracemalloc.start()
+    total = 0
+    for _ in range(repeats):
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        fn()
+        total += tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return total / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeats', type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    buffer = FrameBuffer()
+    for width, height in ((640, 480), (320, 240)):
+        frame = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+        legacy = time_us(lambda: legacy_preprocess(frame), args.repeats)
+        shared = time_us(lambda: buffer.fill_one(frame), args.repeats)
+        legacy_bytes = allocated_bytes(lambda: legacy_preprocess(frame))
+        shared_bytes = allocated_bytes(lambda: buffer.fill_one(frame))
+        print(f"{width}x{height}: legacy {legacy:7.1f} us/frame, {legacy_bytes / 1024:7.1f} KiB/frame   "
+              f"buffered {shared:7.1f} us/frame, {shared_bytes / 1024:7.1f} KiB/frame   "
+              f"speedup {legacy / shared:5.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""FPS / latency / CPU benchmark of the realtime ADHD pipelines, headless.
+
+Each configuration runs RealtimePipeline without a window for --duration
+seconds on a synthetic camera (a moving or a static scene, paced at
+--source-fps) or on any --source, and reports end-to-end results per second,
+capture FPS, inference latency percentiles (per predict call, so gated frames
+count as near-zero) and the CPU cores the process kept busy.
+
+    python benchmarks/realtime.py --pipelines eye session --strides 1 2 --gate off on --duration 10
+"""
+import argparse
+import importlib
+import itertools
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+from adhd.frame_sources import SyntheticSource, open_source
+from adhd.realtime import ChangeGate, RealtimePipeline
+
+# Scene of the synthetic camera: pixels the bright square moves per frame
+SCENES = {'moving': 4, 'static': 0}
+
+
+def load_pipeline(name):
+    """Returns the frame predictor of a realtime script (this loads its models)."""
+    if name == 'eye':
+        return importlib.import_module('adhd.RealtimeEye').predict_frame
+    if name == 'face':
+        return importlib.import_module('adhd.RealtimeFace').predict_frame
+    session = importlib.import_module('adhd.RealtimeSession')
+    return session.SessionScorer(session.load_session_model())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pipelines', nargs='+', choices=('eye', 'face', 'session'), default=['eye', 'face', 'session'])
+    parser.add_argument('--strides', nargs='+', type=int, default=[1, 2])
+    parser.add_argument('--gate', nargs='+', choices=('off', 'on'), default=['off', 'on'])
+    parser.add_argument('--scenes', nargs='+', choices=sorted(SCENES), default=['moving', 'static'])
+    parser.add_argument('--source', help='frame source spec instead of the synthetic scenes (see adhd/frame_sources.py)')
+    parser.add_argument('--source-fps', type=float, default=30, help='synthetic camera rate (0 = as fast as possible)')
+    parser.add_argument('--duration', type=float, default=10)
+    args = parser.parse_args()
+
+    scenes = [args.source] if args.source else args.scenes
+    print(f"{'pipeline':8s} {'scene':10s} {'stride':>6s} {'gate':>4s} {'results/s':>9s} {'capture/s':>9s} "
+          f"{'p50 ms':>7s} {'p95 ms':>7s} {'p99 ms':>7s} {'skipped':>7s} {'cpu cores':>9s}")
+    for name in args.pipelines:
+        predict = load_pipeline(name)
+        for scene, stride, gate in itertools.product(scenes, args.strides, args.gate):
+            source = open_source(scene) if args.source else SyntheticSource(fps=args.source_fps, motion=SCENES[scene])
+            predict_fn = ChangeGate(predict) if gate == 'on' else predict
+            stats = RealtimePipeline(source, predict_fn, stride=stride, headless=True, duration=args.duration).run()
+            results_per_s = stats['frames_inferred'] / stats['elapsed_s'] if stats['elapsed_s'] else 0.0
+            capture_per_s = stats['frames_captured'] / stats['elapsed_s'] if stats['elapsed_s'] else 0.0
+            print(f"{name:8s} {scene[:10]:10s} {stride:6d} {gate:>4s} {results_per_s:9.1f} {capture_per_s:9.1f} "
+                  f"{stats.get('latency_p50_ms', 0):7.2f} {stats.get('latency_p95_ms', 0):7.2f} "
+                  f"{stats.get('latency_p99_ms', 0):7.2f} {stats.get('skipped_fraction', 0):7.0%} {stats['cpu_cores']:9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""Benchmarks common/segmentation.py against the per-line contour segmentation it replaced.
+
+The legacy path is the `segment_words` + `segment_characters` pair that was
+copied across dysgraphia/flaskapp.py, dysgraphia/flaskapp2.py and
+dyslexia/latest_app.py, timed up to the point where it has every word and
+glyph box. Both paths run on the page downscaled to 1000px wide (what the
+services do) and at full resolution, on the two sample pages and on a
+dense synthetic A4 worksheet.
+
+Glyph parity is checked too: how many legacy glyph boxes the shared path also
+finds, and how many of those crops (what the letter and reversal models see)
+are pixel-identical, and whether both paths find the same words. The one
+known difference: when two line boxes overlap, the legacy path emits a word
+again, or a clipped piece of it, from the other line's box.
+
+    python benchmarks/segmentation.py [page.jpg ...] --repeats 20
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+from common.segmentation import crop, resize_page, segment_page
+
+
+def legacy_segment(img, max_width):
+    img = resize_page(img, max_width)
+    img_gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    _, thresh = cv2.threshold(img_gray, 80, 255, cv2.THRESH_BINARY_INV)
+
+    dilated_line = cv2.dilate(thresh, np.ones((3, 85), np.uint8), iterations=1)
+    contours_line, _ = cv2.findContours(dilated_line, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
+    sorted_lines = sorted(contours_line, key=lambda ctr: cv2.boundingRect(ctr)[1])
+    dilated_word = cv2.dilate(thresh, np.ones((3, 15), np.uint8), iterations=1)
+
+    words, glyphs, crops = [], [], []
+    for line in sorted_lines:
+        x, y, w, h = cv2.boundingRect(line)
+        contours_word, _ = cv2.findContours(dilated_word[y:y + h, x:x + w], cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
+        for word in sorted(contours_word, key=lambda c: cv2.boundingRect(c)[0]):
+            if cv2.contourArea(word) < 400:
+                continue
+            x2, y2, w2, h2 = cv2.boundingRect(word)
+            words.append((x + x2, y + y2, w2, h2))
+
+            word_gray = img_gray[y + y2:y + y2 + h2, x + x2:x + x2 + w2]
+            _, word_thresh = cv2.threshold(word_gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+            contours, _ = cv2.findContours(word_thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            char_bboxes = sorted([cv2.boundingRect(c) for c in contours], key=lambda b: b[0])
+            for bx, by, bw, bh in char_bboxes:
+                if bw > 5 and bh > 10:
+                    glyphs.append((x + x2 + bx, y + y2 + by, bw, bh))
+                    crops.append(word_thresh[by:by + bh, bx:bx + bw])
+    return words, glyphs, crops
+
+
+def glyph_parity(glyphs, crops, segmentation):
+    """Returns how many legacy glyphs the shared segmentation finds, and how many of their crops are identical."""
+    shared = {tuple(int(v) for v in box): crop(segmentation.glyph_binary, source)
+              for box, source in zip(segmentation.glyphs, segmentation.glyph_crops)}
+    found = [box for box in glyphs if box in shared]
+    identical = sum(np.array_equal(legacy, shared[box]) for box, legacy in zip(glyphs, crops) if box in shared)
+    return len(found), identical
+
+
+def dense_worksheet(width=2480, height=3508, seed=0):
+    """Renders an A4 page at 300 dpi filled with script-font words (about 300 words)."""
+    rng = np.random.default_rng(seed)
+    page = np.full((height, width, 3), 235, np.uint8)
+    font, scale, thickness = cv2.FONT_HERSHEY_SCRIPT_SIMPLEX, 2.2, 4
+    y = 120
+    while y < height - 60:
+        x = 80
+        while x < width - 300:
+            word = ''.join(rng.choice(list('abcdefghijklmnopqrstuvwxyz'), rng.integers(2, 8)))
+            cv2.putText(page, word, (x, y), font, scale, (30, 30, 30), thickness, cv2.LINE_AA)
+            x += cv2.getTextSize(word, font, scale, thickness)[0][0] + int(rng.integers(60, 110))
+        y += 110
+    return page
+
+
+def time_ms(fn, repeats):
+    fn()  # warm-up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000.0)
+    return float(np.median(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('images', nargs='*', default=[os.path.join(ROOT, 'dysgraphia', 'handwritten.jpg'),
+                                                      os.path.join(ROOT, 'dysgraphia', 'uploads', 'uploaded_image.png')])
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    pages = [(os.path.basename(path), cv2.imread(path)) for path in args.images]
+    pages.append(('dense worksheet', dense_worksheet()))
+
+    for name, page in pages:
+        print(f"{name}: {page.shape[1]}x{page.shape[0]}")
+        for label, max_width in (('1000px wide', 1000), ('full resolution', None)):
+            words, glyphs, crops = legacy_segment(page, max_width)
+            segmentation = segment_page(page, max_width)
+            legacy = time_ms(lambda: legacy_segment(page, max_width), args.repeats)
+            shared = time_ms(lambda: segment_page(page, max_width), args.repeats)
+            found, identical = glyph_parity(glyphs, crops, segmentation)
+            shared_words = set(map(tuple, segmentation.words.tolist()))
+            missing = sum(word not in shared_words for word in set(words))
+            print(f"  {label:16s} legacy {legacy:8.2f} ms ({len(words)} words, {len(glyphs)} glyphs)   "
+                  f"shared {shared:8.2f} ms ({len(segmentation.words)} words, {len(segmentation.glyphs)} glyphs)   "
+                  f"speedup {legacy / shared:5.2f}x   glyphs found {found}/{len(glyphs)}, "
+                  f"identical crops {identical}/{found}, legacy words missing {missing}")
+    print("Limitation: at full resolution the shared path is no faster than the legacy one. Its whole-page "
+          "dilations and contour passes cost about as much as the legacy per-line passes; the gains are at the "
+          "1000px width the services use.")
+
+
+if __name__ == '__main__':
+    main()
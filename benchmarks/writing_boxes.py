@@ -0,0 +1,102 @@
+"""Benchmarks dysgraphia/boxes.py against the per-box ink ratios it replaced.
+
+The legacy path thresholds and counts every box's ROI separately. The new one
+binarizes the page once and reads every box's ink count from one summed-area
+table. Both run on synthetic worksheets with a grid of writing boxes, with
+closed outlines (one detected box per cell, no shared pixels) and with broken
+outlines (nested detections that share pixels). The ratio step is timed alone
+and as part of the whole analysis including box detection. The results must
+match exactly.
+
+    python benchmarks/writing_boxes.py --boxes 100 400 1600 --repeats 10
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+from dysgraphia.boxes import analyze_blocks, detect_boxes, ink_integral, ink_ratios
+
+
+def legacy_ratios(gray, boxes):
+    text_ratios = []
+    for (x, y, w, h) in boxes:
+        roi = gray[y:y+h, x:x+w]
+        _, thresholded = cv2.threshold(roi, 128, 255, cv2.THRESH_BINARY_INV)
+        text_ratios.append(np.count_nonzero(thresholded) / (w * h))
+    return np.array(text_ratios)
+
+
+def legacy_analyze(image):
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    boxes = sorted(map(tuple, detect_boxes(gray)), key=lambda b: (b[1], b[0]))
+    return legacy_ratios(gray, boxes)
+
+
+def worksheet(box_count, cell=120, broken=False, seed=0):
+    """A white page with a square grid of `box_count` boxes, each holding an inner box and some strokes.
+
+    The strokes are anti-aliased and each box has a patch of gray shading
+    around the ink threshold (127 to 129), so the ratios check the threshold
+    boundary and not only pure black and white.
+
+    With `broken=True` every outer box has a gap in its top edge, as faint or
+    hand-drawn outlines do in phone photos. Its inner box and strokes then
+    become boxes of their own, nested inside the outer one.
+    """
+    rng = np.random.default_rng(seed)
+    side = int(np.ceil(np.sqrt(box_count)))
+    page = np.full((side * cell + 40, side * cell + 40, 3), 255, np.uint8)
+    for i in range(box_count):
+        x, y = 20 + (i % side) * cell, 20 + (i // side) * cell
+        cv2.rectangle(page, (x + 5, y + 5), (x + cell - 5, y + cell - 5), (0, 0, 0), 2)
+        cv2.rectangle(page, (x + 25, y + 25), (x + cell - 25, y + cell - 25), (0, 0, 0), 1)
+        if broken:
+            page[y + 2:y + 9, x + cell // 2 - 6:x + cell // 2 + 6] = 255
+        for _ in range(4):
+            p1 = tuple(int(v) for v in rng.integers((x + 30, y + 30), (x + cell - 30, y + cell - 30)))
+            p2 = tuple(int(v) for v in rng.integers((x + 30, y + 30), (x + cell - 30, y + cell - 30)))
+            cv2.line(page, p1, p2, (40, 40, 40), 3, cv2.LINE_AA)
+        page[y + 30:y + 33, x + 30:x + 60] = (127, 128, 129)[i % 3]
+    return page
+
+
+def time_ms(fn, repeats):
+    fn()  # warm-up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000.0)
+    return float(np.median(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--boxes', nargs='+', type=int, default=[100, 400, 1600])
+    parser.add_argument('--repeats', type=int, default=10)
+    args = parser.parse_args()
+
+    for box_count, broken in ((count, broken) for count in args.boxes for broken in (False, True)):
+        page = worksheet(box_count, broken=broken)
+        gray = cv2.cvtColor(page, cv2.COLOR_BGR2GRAY)
+        boxes = detect_boxes(gray)
+        assert np.array_equal(legacy_ratios(gray, boxes), ink_ratios(ink_integral(gray), boxes))
+
+        legacy = time_ms(lambda: legacy_ratios(gray, boxes), args.repeats)
+        shared = time_ms(lambda: ink_ratios(ink_integral(gray), boxes), args.repeats)
+        legacy_total = time_ms(lambda: legacy_analyze(page), args.repeats)
+        shared_total = time_ms(lambda: analyze_blocks(page), args.repeats)
+        layout = 'broken' if broken else 'closed'
+        print(f"{page.shape[1]}x{page.shape[0]} {layout}, {len(boxes)} boxes detected: "
+              f"ratios legacy {legacy:8.2f} ms, integral {shared:7.2f} ms ({legacy / shared:5.1f}x)   "
+              f"whole analysis legacy {legacy_total:8.2f} ms, new {shared_total:8.2f} ms ({legacy_total / shared_total:4.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""Benchmarks dysgraphia/ruled_lines.py against the Canny + HoughLinesP path it replaced.
+
+The legacy path is `analyze_letter_position` as it was in WritingLines.py:
+Canny and probabilistic Hough over the whole page, then only the first and last
+segment by y. The new path finds every ruled line from the row projection of
+a run-length-filtered line mask, with and without deskew. Both run on synthetic
+ruled worksheets (several two-line writing rows of handwriting-like strokes)
+at scan and phone-photo resolutions, straight and tilted by 2 degrees, and on
+the phone photo of a notebook page in dysgraphia/uploads. That page was
+taken sideways, so its faint ruling runs top to bottom; deskew only searches
++-MAX_SKEW_DEGREES, so no line is found and the skew is reported as 0.
+
+The glyph overflow stage is also timed alone on pages of many small letters,
+against a per-glyph Python loop over the same component stats.
+
+    python benchmarks/writing_lines.py --repeats 5
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+from dysgraphia.ruled_lines import (MIN_GLYPH_AREA, OVERFLOW_TOLERANCE, analyze_letter_position, band_text_ratios,
+                                    find_ruled_lines, glyph_overflow, glyph_stats)
+
+# A real ruled-notebook page, photographed sideways (its ruling is vertical)
+PHOTO = os.path.join(ROOT, 'dysgraphia', 'uploads', 'uploaded_image.png')
+
+
+def legacy_analyze(image):
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    edges = cv2.Canny(gray, 50, 150)
+    lines = cv2.HoughLinesP(edges, 1, np.pi/180, threshold=100, minLineLength=100, maxLineGap=10)
+    if lines is None or len(lines) < 2:
+        return "Error: Could not detect two horizontal lines.", 0
+    # (N, 1, 4) on OpenCV 4, (N, 4) on OpenCV 5
+    lines = sorted(lines.reshape(-1, 4), key=lambda line: line[1])
+    region = gray[lines[0][1]:lines[-1][1], :]
+    text_ratio = np.count_nonzero(region < 128) / (region.shape[0] * region.shape[1])
+    return ("High Potential of Dysgraphia" if text_ratio > 0.3 else "Low Potential of Dysgraphia"), len(lines)
+
+
+def loop_overflow(page, bands):
+    """Glyph overflow with one Python iteration per component, for comparison."""
+    stats, _ = glyph_stats(page)
+    overflowing = glyphs = 0
+    for x, y, w, h, area in stats:
+        if area < MIN_GLYPH_AREA:
+            continue
+        index = next((i for i, (_, bottom) in enumerate(bands)
+                      if y + h - 1 <= bottom + OVERFLOW_TOLERANCE * max(bottom - bands[i][0], 1)), len(bands) - 1)
+        top, bottom = bands[index]
+        if index > 0 and y < top and y + h - 1 < top + max(bottom - top, 1) // 2:
+            index -= 1
+            top, bottom = bands[index]
+        height = max(bottom - top, 1)
+        if y + h - 1 < top or y > bottom or h > 3 * height:
+            continue
+        glyphs += 1
+        overflowing += max(top - y, y + h - 1 - bottom, 0) / height > OVERFLOW_TOLERANCE
+    return glyphs, overflowing
+
+
+def ruled_worksheet(width, height, rows=8, tilt=0.0, seed=0):
+    """A ruled page with `rows` two-line writing rows filled with letter-like strokes."""
+    rng = np.random.default_rng(seed)
+    page = np.full((height, width, 3), 245, np.uint8)
+    pitch = (height - 200) // rows
+    band = int(pitch * 0.45)
+    thickness = max(2, width // 800)
+    for row in range(rows):
+        top = 100 + row * pitch
+        bottom = top + band
+        for y in (top, bottom):
+            cv2.line(page, (width // 30, y), (width - width // 30, y), (150, 120, 100), thickness)
+        x = width // 20
+        while x < width - width // 12:
+            letter = int(band * rng.uniform(0.5, 1.25))
+            cv2.ellipse(page, (x, bottom - letter // 2), (band // 7, letter // 2), 0, 0, 360, (30, 30, 30), thickness + 2)
+            x += int(band * rng.uniform(0.35, 0.6))
+    if tilt:
+        matrix = cv2.getRotationMatrix2D((width / 2, height / 2), tilt, 1.0)
+        page = cv2.warpAffine(page, matrix, (width, height), borderValue=(245, 245, 245))
+    return page
+
+
+def time_ms(fn, repeats):
+    fn()  # warm-up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000.0)
+    return float(np.median(timings))
+
+
+def report(page, repeats):
+    review, segments = legacy_analyze(page)
+    legacy = time_ms(lambda: legacy_analyze(page), repeats)
+    print(f"  hough       {legacy:8.1f} ms  {segments:5d} segments, first/last only -> {review}")
+    for deskew in (False, True):
+        review, details = analyze_letter_position(page, deskew)
+        elapsed = time_ms(lambda: analyze_letter_position(page, deskew), repeats)
+        label = 'projection' + (' + deskew' if deskew else '')
+        print(f"  {label:20s} {elapsed:8.1f} ms  {len(details['lines']):3d} lines, "
+              f"{sum(band['written'] for band in details.get('bands', []))} written bands, "
+              f"skew {details['skew_degrees']:+.2f} ({legacy / elapsed:4.1f}x) -> {review}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    for (width, height), tilt in ((size, tilt) for size in ((1240, 1754), (2480, 3508), (3024, 4032)) for tilt in (0.0, 2.0)):
+        page = ruled_worksheet(width, height, tilt=tilt)
+        print(f"{width}x{height}, tilt {tilt:.0f} deg, 8 ruled rows (16 lines):")
+        report(page, args.repeats)
+
+    photo = cv2.imread(PHOTO)
+    if photo is not None:
+        print(f"{os.path.relpath(PHOTO, ROOT)}, {photo.shape[1]}x{photo.shape[0]} notebook photo:")
+        report(photo, args.repeats)
+
+    for width, height, rows in ((2480, 3508, 8), (2480, 3508, 24), (3024, 4032, 40)):
+        page = find_ruled_lines(cv2.cvtColor(ruled_worksheet(width, height, rows=rows), cv2.COLOR_BGR2GRAY))
+        bands, ratios = band_text_ratios(page)
+        bands = bands[ratios >= 0.02]
+        _, per_page = glyph_overflow(page, bands)
+        vectorized = time_ms(lambda: glyph_overflow(page, bands), args.repeats)
+        loop = time_ms(lambda: loop_overflow(page, bands), args.repeats)
+        print(f"glyph overflow, {width}x{height}, {rows} rows, {per_page['glyphs']} glyphs "
+              f"({per_page['overflowing_glyphs']} overflowing):")
+        print(f"  per-glyph loop {loop:8.1f} ms")
+        print(f"  vectorized     {vectorized:8.1f} ms ({loop / vectorized:4.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
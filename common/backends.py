@@ -0,0 +1,68 @@
+import os
+import threading
+
+import numpy as np
+
+try:
+    # The standalone runtime is much lighter than full TensorFlow when available
+    from tflite_runtime.interpreter import Interpreter
+except ImportError:
+    Interpreter = None
+
+# Quantization variants produced by common/convert_models.py
+QUANTIZATIONS = ('float', 'dynamic', 'int8')
+
+
+def tflite_path(keras_path, quantization):
+    """Returns where the TFLite conversion of a .h5 model is stored, e.g. detection.int8.tflite."""
+    return f'{os.path.splitext(keras_path)[0]}.{quantization}.tflite'
+
+
+class TFLiteModel:
+    """Runs a converted .tflite model behind the same predict calls as a Keras model."""
+
+    def __init__(self, path, num_threads=None):
+        if Interpreter is not None:
+            self.interpreter = Interpreter(model_path=path, num_threads=num_threads)
+        else:
+            import tensorflow as tf
+            self.interpreter = tf.lite.Interpreter(model_path=path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self.path = path
+
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self._lock = threading.Lock()  # interpreters are not thread-safe
+
+    @property
+    def input_shape(self):
+        return (None,) + tuple(self._input['shape'][1:])
+
+    def predict_on_batch(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        with self._lock:
+            if tuple(self._input['shape']) != batch.shape:
+                self.interpreter.resize_tensor_input(self._input['index'], batch.shape)
+                self.interpreter.allocate_tensors()
+                self._input = self.interpreter.get_input_details()[0]
+                self._output = self.interpreter.get_output_details()[0]
+
+            self.interpreter.set_tensor(self._input['index'], self._quantize(batch))
+            self.interpreter.invoke()
+            return self._dequantize(self.interpreter.get_tensor(self._output['index']))
+
+    def predict(self, batch, **kwargs):
+        return self.predict_on_batch(batch)
+
+    def _quantize(self, batch):
+        scale, zero_point = self._input['quantization']
+        if self._input['dtype'] == np.float32 or not scale:
+            return batch
+        info = np.iinfo(self._input['dtype'])
+        return np.clip(np.round(batch / scale + zero_point), info.min, info.max).astype(self._input['dtype'])
+
+    def _dequantize(self, output):
+        scale, zero_point = self._output['quantization']
+        if self._output['dtype'] == np.float32 or not scale:
+            return output.copy()
+        return (output.astype(np.float32) - zero_point) * scale
@@ -0,0 +1,100 @@
+import threading
+import time
+import queue
+from collections import Counter
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class MicroBatcher:
+    """Groups concurrent single-item predictions into one batched forward pass.
+
+    Callers block in `submit` while a worker thread collects queued items until
+    either `max_batch_size` items are waiting or the oldest one has waited
+    `max_wait_ms`, then runs `predict_fn` once on the stacked batch and hands
+    each caller its own row of the result. Items are stacked into one batch
+    array reused for every batch (reallocated only if the item shape changes),
+    so `predict_fn` must not keep a reference to its input.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=16, max_wait_ms=5.0):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue = queue.Queue()
+        self._batch = None  # (max_batch_size, *item shape) array the worker stacks items into
+        self._lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._items = 0
+        self._total_wait = 0.0
+        self._max_wait_seen = 0.0
+
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(self, item):
+        """Queues one input and returns its prediction once its batch has run."""
+        future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        return future.result()
+
+    def stats(self):
+        """Returns queue depth, batch-size histogram and wait-time figures."""
+        with self._lock:
+            batches = sum(self._batch_sizes.values())
+            return {
+                'queue_depth': self._queue.qsize(),
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000.0,
+                'batches': batches,
+                'items': self._items,
+                'batch_size_histogram': {str(size): count for size, count in sorted(self._batch_sizes.items())},
+                'mean_batch_size': self._items / batches if batches else 0.0,
+                'mean_wait_ms': self._total_wait / self._items * 1000.0 if self._items else 0.0,
+                'max_wait_ms_seen': self._max_wait_seen * 1000.0,
+            }
+
+    def _collect(self):
+        # Block for the first item, then fill the batch until it is full or the deadline passes
+        pending = [self._queue.get()]
+        deadline = pending[0][2] + self.max_wait
+        while len(pending) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining > 0:
+                    pending.append(self._queue.get(timeout=remaining))
+                else:
+                    # Past the deadline, only take items that are already waiting
+                    pending.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return pending
+
+    def _run(self):
+        while True:
+            pending = self._collect()
+            started = time.perf_counter()
+            waits = [started - enqueued for _, _, enqueued in pending]
+            with self._lock:
+                self._batch_sizes[len(pending)] += 1
+                self._items += len(pending)
+                self._total_wait += sum(waits)
+                self._max_wait_seen = max(self._max_wait_seen, max(waits))
+
+            try:
+                results = self.predict_fn(self._stack([item for item, _, _ in pending]))
+            except Exception as e:
+                for _, future, _ in pending:
+                    future.set_exception(e)
+                continue
+
+            for (_, future, _), result in zip(pending, results):
+                future.set_result(result)
+
+    def _stack(self, items):
+        first = np.asarray(items[0])
+        if self._batch is None or self._batch.shape[1:] != first.shape or self._batch.dtype != first.dtype:
+            self._batch = np.empty((self.max_batch_size,) + first.shape, dtype=first.dtype)
+        return np.stack(items, out=self._batch[:len(items)])
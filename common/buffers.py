@@ -0,0 +1,73 @@
+"""Reusable batch arrays for the handwriting services.
+
+A segmented page says how many crops it has before any is made, so the crops
+can be written straight into one batch array instead of a list that is then
+copied. `BufferPool.batch` lends out the first n rows of a pooled array and
+takes it back when the `with` block ends, so a steady stream of requests stops
+allocating after the first few. Capacity is rounded up to a multiple of
+BUFFER_ROW_STEP rows so pages of similar size share buffers, and arrays larger
+than BUFFER_MAX_MB are used once and freed rather than kept.
+"""
+import os
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+# Spare arrays kept per item shape and dtype
+BUFFER_POOL_SIZE = int(os.environ.get('BUFFER_POOL_SIZE', 2))
+# Arrays over this many megabytes are not returned to the pool
+BUFFER_MAX_MB = float(os.environ.get('BUFFER_MAX_MB', 256))
+# Capacities are rounded up to a multiple of this many rows
+BUFFER_ROW_STEP = 64
+
+
+class BufferPool:
+    """Pools (capacity, *item_shape) arrays per item shape and dtype."""
+
+    def __init__(self, size=BUFFER_POOL_SIZE, max_bytes=BUFFER_MAX_MB * 2 ** 20):
+        self.size = size
+        self.max_bytes = max_bytes
+        self._free = {}  # (item_shape, dtype) -> spare arrays, smallest first
+        self._lock = threading.Lock()
+        self._allocated = 0
+        self._reused = 0
+
+    @contextmanager
+    def batch(self, rows, item_shape, dtype=np.float32):
+        """Lends a (rows, *item_shape) array; its contents are whatever the last borrower left."""
+        key = (tuple(item_shape), np.dtype(dtype).str)
+        with self._lock:
+            spares = self._free.setdefault(key, [])
+            index = next((i for i, spare in enumerate(spares) if len(spare) >= rows), None)
+            buffer = spares.pop(index) if index is not None else None
+            if buffer is None:
+                self._allocated += 1
+            else:
+                self._reused += 1
+        if buffer is None:
+            capacity = max(1, -(-rows // BUFFER_ROW_STEP)) * BUFFER_ROW_STEP
+            buffer = np.empty((capacity,) + key[0], dtype=dtype)
+
+        try:
+            yield buffer[:rows]
+        finally:
+            if buffer.nbytes <= self.max_bytes:
+                with self._lock:
+                    spares = self._free[key]
+                    spares.append(buffer)
+                    spares.sort(key=len)
+                    # Past the limit, keep the largest spares; they serve every smaller page too
+                    del spares[:max(0, len(spares) - self.size)]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'allocated': self._allocated,
+                'reused': self._reused,
+                'pooled_mb': round(sum(spare.nbytes for spares in self._free.values() for spare in spares) / 2 ** 20, 1),
+            }
+
+
+# Shared by every analysis in the process
+buffers = BufferPool()
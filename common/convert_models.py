@@ -0,0 +1,79 @@
+"""Converts the Keras .h5 models to TFLite and keeps only the conversions that agree.
+
+Each requested quantization (float, dynamic-range or full int8) is converted,
+checked with common/parity.py on the held-out images, and written next to the
+.h5 file (e.g. adhd/detection.int8.tflite) only if its class agreement with
+Keras reaches --min-agreement. The services pick the conversions up with
+INFERENCE_BACKEND=tflite and TFLITE_QUANTIZATION=<variant>.
+
+    python -m common.convert_models --holdout path/to/images --quantization dynamic int8
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.backends import QUANTIZATIONS, TFLiteModel, tflite_path
+from common.model_registry import MODELS, ROOT
+from common.parity import compare, load_holdout
+
+# Number of held-out images used to calibrate int8 activation ranges
+CALIBRATION_IMAGES = 200
+
+
+def convert(keras_model, quantization, calibration):
+    """Returns the TFLite flatbuffer of a Keras model for the given quantization."""
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(keras_model)
+    if quantization in ('dynamic', 'int8'):
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantization == 'int8':
+        # Full integer kernels; inputs and outputs stay float32 so callers don't change
+        converter.representative_dataset = lambda: ([img[np.newaxis]] for img in calibration[:CALIBRATION_IMAGES])
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    return converter.convert()
+
+
+def main():
+    from tensorflow.keras.models import load_model
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--holdout', required=True, help='directory of held-out images for calibration and parity')
+    parser.add_argument('--models', nargs='+', default=[n for n, (_, loader) in MODELS.items() if loader == 'keras'])
+    parser.add_argument('--quantization', nargs='+', choices=QUANTIZATIONS, default=['dynamic'])
+    parser.add_argument('--min-agreement', type=float, default=0.99)
+    args = parser.parse_args()
+
+    rejected = 0
+    for name in args.models:
+        keras_path = os.path.join(ROOT, MODELS[name][0])
+        keras_model = load_model(keras_path)
+        batch = load_holdout(args.holdout, keras_model.input_shape)
+
+        for quantization in args.quantization:
+            target = tflite_path(keras_path, quantization)
+            candidate = target + '.candidate'
+            with open(candidate, 'wb') as f:
+                f.write(convert(keras_model, quantization, batch))
+
+            report = compare(keras_model, {quantization: TFLiteModel(candidate)}, batch)
+            result = report[quantization]
+            summary = (f"{name} {quantization}: agreement {result['agreement']:.2%}, "
+                       f"{result['mean_ms']:.2f} ms vs {report['keras']['mean_ms']:.2f} ms (keras)")
+
+            if result['agreement'] >= args.min_agreement:
+                os.replace(candidate, target)
+                print(f"shipped  {summary} -> {os.path.relpath(target, ROOT)}")
+            else:
+                os.remove(candidate)
+                rejected += 1
+                print(f"rejected {summary}")
+
+    sys.exit(1 if rejected else 0)
+
+
+if __name__ == '__main__':
+    main()
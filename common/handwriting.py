@@ -0,0 +1,200 @@
+"""Handwriting analyses run on a page segmented by common/segmentation.py.
+
+The dyslexia reversal service (dyslexia/latest_app.py), the word-level and
+letter-by-letter dysgraphia services (dysgraphia/flaskapp.py and
+dysgraphia/flaskapp2.py) and the combined worksheet endpoint all call these,
+so one segmentation can feed every model. An analysis that finds nothing to
+classify raises ValueError with the message the services return to clients.
+"""
+import os
+from collections import Counter
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from common.buffers import buffers
+from common.model_registry import registry
+from common.segmentation import crop
+
+# Maximum number of crops prepared and sent to a model at once
+MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', 256))
+
+# Letter reversals (dyslexia_handwriting_model.h5)
+REVERSAL_LABELS = ['Corrected', 'Reversal', 'Normal']
+REVERSAL_SIZE = 128
+
+# Word-level dysgraphia (handwriting_dysgraphia_model.h5)
+WORD_LABELS = ['Low Potential Dysgraphia', 'Potential Dysgraphia']
+WORD_SIZE = 150
+
+# Letter-by-letter handwriting quality (letter_by_letter_check_model.h5)
+LETTER_LABELS = ["Low", "Intermediary", "Good"]
+LETTER_SIZE = 150
+LETTER_REVIEWS = {
+    "Good": "Excellent performance! Your handwriting is very clear and well-structured. Keep up the great work!",
+    "Intermediary": "Good performance! Your handwriting is clear, but there is some room for improvement. Practice regularly to enhance your skills.",
+    "Low": "Fair performance. Your handwriting shows potential, but it needs improvement. Focus on consistency and clarity."
+}
+
+
+def crop_batches(count, item_shape, fill):
+    """Yields (start, batch) for every MAX_BATCH_SIZE crops of a page, in order.
+
+    Each batch is a view of one pooled float32 buffer, filled by
+    `fill(start, batch)` just before it is yielded, so a page never holds more
+    than one chunk of crops in memory. The buffer goes back to the pool when
+    the generator is exhausted or closed.
+    """
+    with buffers.batch(min(count, MAX_BATCH_SIZE), item_shape) as buffer:
+        for start in range(0, count, MAX_BATCH_SIZE):
+            batch = buffer[:min(MAX_BATCH_SIZE, count - start)]
+            fill(start, batch)
+            yield start, batch
+
+
+def reversal_glyph(binary, box, canvas=None):
+    """Draws one character, black on white, at the centre of a 200x200 canvas."""
+    if canvas is None:
+        canvas = np.empty((200, 200), dtype=np.uint8)
+    canvas.fill(255)  # White background
+    char_img = cv2.resize(crop(binary, box), (64, 64))
+    offset = (200 - 64) // 2
+    # Ensure text is black and background is white
+    np.subtract(255, char_img, out=canvas[offset:offset + 64, offset:offset + 64])
+    return canvas
+
+
+def preprocess_reversal_glyph(image, out=None):
+    """Resizes and normalizes a glyph into a (height, width, 3) float32 array."""
+    image = image.resize((REVERSAL_SIZE, REVERSAL_SIZE))
+    image = np.asarray(image, dtype=np.float32)
+    if image.ndim == 2:  # If grayscale, broadcast to RGB
+        image = image[..., np.newaxis]
+    if out is None:
+        out = np.empty((REVERSAL_SIZE, REVERSAL_SIZE, 3), dtype=np.float32)
+    np.multiply(image, 1 / 255.0, out=out)
+    return out
+
+
+def reversal_tensors(segmentation, start, out):
+    """Writes the page's glyphs from `start` on into `out`, as the reversal model's input."""
+    canvas = np.empty((200, 200), dtype=np.uint8)
+    for i, box in enumerate(segmentation.glyph_crops[start:start + len(out)]):
+        reversal_glyph(segmentation.glyph_binary, box, canvas)
+        preprocess_reversal_glyph(Image.fromarray(canvas), out=out[i])
+    return out
+
+
+def predict_reversals(segmentation):
+    """Returns the predicted class index of each glyph of the page."""
+    model = registry.get('dyslexia_handwriting')
+    count = len(segmentation.glyphs)
+    predicted_classes = np.empty(count, dtype=np.intp)
+    fill = lambda start, out: reversal_tensors(segmentation, start, out)
+    for start, batch in crop_batches(count, (REVERSAL_SIZE, REVERSAL_SIZE, 3), fill):
+        prediction = model.predict_on_batch(batch)
+        predicted_classes[start:start + len(batch)] = np.argmax(prediction, axis=1)
+    return predicted_classes
+
+
+def analyze_reversals(segmentation):
+    """Returns the percentage of the page's characters in each reversal class."""
+    # Count the predicted glyphs of each class
+    counts = np.zeros(len(REVERSAL_LABELS), dtype=np.intp)
+    if len(segmentation.glyphs):
+        counts = np.bincount(predict_reversals(segmentation), minlength=len(REVERSAL_LABELS))
+
+    total_predictions = int(counts.sum())
+    if total_predictions > 0:
+        percentages = {label: (int(count) / total_predictions) * 100 for label, count in zip(REVERSAL_LABELS, counts)}
+    else:
+        percentages = {label: 0 for label in REVERSAL_LABELS}
+    return {'percentages': percentages}
+
+
+def word_tensors(segmentation, start=0, out=None):
+    """Writes the binarized words of the page from `start` on into a (n, 150, 150, 1) float32 batch."""
+    if out is None:
+        out = np.empty((len(segmentation.words) - start, WORD_SIZE, WORD_SIZE, 1), dtype=np.float32)
+    for i, box in enumerate(segmentation.words[start:start + len(out)]):
+        # Binarized word (text -> white, background -> black), resized and normalized
+        word_resized = cv2.resize(crop(segmentation.binary, box), (WORD_SIZE, WORD_SIZE))
+        np.multiply(word_resized, 1 / 255.0, out=out[i, ..., 0])
+    return out
+
+
+def analyze_words(segmentation):
+    """Returns the majority word-level dysgraphia class of the page."""
+    count = len(segmentation.words)
+    if count == 0:
+        raise ValueError('No valid words detected')
+
+    # Predict on segmented words
+    model = registry.get('dysgraphia_words')
+    predicted_classes = np.empty(count, dtype=np.intp)
+    fill = lambda start, out: word_tensors(segmentation, start, out)
+    for start, batch in crop_batches(count, (WORD_SIZE, WORD_SIZE, 1), fill):
+        prediction = np.asarray(model.predict_on_batch(batch))
+        predicted_classes[start:start + len(batch)] = np.rint(prediction[:, 0])
+    majority_prediction = Counter(predicted_classes.tolist()).most_common(1)[0][0]
+    return {'prediction': WORD_LABELS[majority_prediction]}
+
+
+def majority_votes(groups, classes, n_groups, n_classes):
+    """Returns the most frequent class of each group, -1 for a group with no members.
+
+    Ties go to the class seen first in the group, as with Counter.most_common.
+    """
+    counts = np.bincount(groups * n_classes + classes, minlength=n_groups * n_classes).reshape(n_groups, n_classes)
+    first_seen = np.full(n_groups * n_classes, len(classes), dtype=np.intp)
+    np.minimum.at(first_seen, groups * n_classes + classes, np.arange(len(classes)))
+    first_seen = first_seen.reshape(n_groups, n_classes)
+
+    # Among each group's most frequent classes, the one seen first
+    tied = counts == counts.max(axis=1, keepdims=True)
+    votes = np.argmin(np.where(tied, first_seen, len(classes) + 1), axis=1)
+    return np.where(counts.any(axis=1), votes, -1)
+
+
+def letter_tensors(segmentation, start=0, out=None):
+    """Writes the page's glyphs from `start` on into a (n, 150, 150, 1) float32 batch."""
+    if out is None:
+        out = np.empty((len(segmentation.glyphs) - start, LETTER_SIZE, LETTER_SIZE, 1), dtype=np.float32)
+    for i, box in enumerate(segmentation.glyph_crops[start:start + len(out)]):
+        char_img = cv2.resize(crop(segmentation.glyph_binary, box), (LETTER_SIZE, LETTER_SIZE))
+        # Invert colors and normalize, straight into the batch
+        np.multiply(255 - char_img, 1 / 255.0, out=out[i, ..., 0])
+    return out
+
+
+def analyze_letters(segmentation):
+    """Returns the letter-by-letter handwriting class of the page and its review.
+
+    All glyphs of the page go through the model in one batch (chunked past
+    MAX_BATCH_SIZE); each word takes the majority class of its letters and the
+    page the majority of its words.
+    """
+    if len(segmentation.words) == 0:
+        raise ValueError('No valid words detected')
+
+    count = len(segmentation.glyphs)
+    if count == 0:
+        raise ValueError('No valid characters detected')
+
+    model = registry.get('dysgraphia_letters')
+    predicted_classes = np.empty(count, dtype=np.intp)
+    fill = lambda start, out: letter_tensors(segmentation, start, out)
+    for start, batch in crop_batches(count, (LETTER_SIZE, LETTER_SIZE, 1), fill):
+        prediction = np.asarray(model.predict_on_batch(batch))
+        predicted_classes[start:start + len(batch)] = np.rint(prediction[:, 0])
+    predicted_classes = np.clip(predicted_classes, 0, len(LETTER_LABELS) - 1)
+
+    # Majority per word, then over the words that have characters, in reading order
+    char_word = np.asarray(segmentation.glyph_word, dtype=np.intp)
+    word_votes = majority_votes(char_word, predicted_classes, len(segmentation.words), len(LETTER_LABELS))
+    word_votes = word_votes[word_votes >= 0]
+    page_vote = majority_votes(np.zeros(len(word_votes), dtype=np.intp), word_votes, 1, len(LETTER_LABELS))[0]
+
+    final_prediction = LETTER_LABELS[page_vote]
+    return {'prediction': final_prediction, 'review': LETTER_REVIEWS[final_prediction]}
@@ -0,0 +1,93 @@
+"""Runs every Flask service of the suite in one process.
+
+Each service keeps its existing routes and port, but all of them share the
+model registry, so only one TensorFlow runtime is loaded and models are loaded
+on first use and evicted under the memory budget. Services don't preload their
+models here; their /ready reports which ones are currently loaded.
+
+    python -m common.model_host --budget-mb 768
+"""
+import argparse
+import importlib.util
+import logging
+import os
+import sys
+import threading
+
+from flask import Flask, jsonify
+from werkzeug.serving import make_server
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+from common import readiness
+from common.model_registry import registry
+
+# Services of the suite: name -> (script relative to the repository root, port)
+SERVICES = {
+    'adhd_focus': ('adhd/flaskapp.py', 5001),
+    'adhd_activity': ('adhd/flaskapp2.py', 5002),
+    'dyscalculia': ('dyscalculia/flaskapp.py', 5003),
+    'dysgraphia_words': ('dysgraphia/flaskapp.py', 5004),
+    'dyslexia': ('dyslexia/latest_app.py', 5005),
+    'writing_box': ('dysgraphia/WritingBox.py', 5006),
+    'writing_lines': ('dysgraphia/WritingLines.py', 5007),
+    'speech': ('dyslexia/Speech.py', 5008),
+    'dysgraphia_letters': ('dysgraphia/flaskapp2.py', 5010),
+    'worksheet': ('worksheet/flaskapp.py', 5011),
+}
+
+# Port of the host's own status app
+STATUS_PORT = 5009
+
+
+def load_service(name, script):
+    """Imports a service script under a unique module name and returns its Flask app."""
+    spec = importlib.util.spec_from_file_location(f'service_{name}', os.path.join(ROOT, script))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.app
+
+
+def create_status_app():
+    status_app = Flask(__name__)
+
+    @status_app.route('/models', methods=['GET'])
+    def models():
+        return jsonify(registry.stats())
+
+    return status_app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--budget-mb', type=float, default=None, help='memory budget for loaded models')
+    parser.add_argument('--services', nargs='+', choices=sorted(SERVICES), default=sorted(SERVICES))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(name)s %(message)s')
+    if args.budget_mb is not None:
+        registry.budget = int(args.budget_mb * 1024 * 1024)
+
+    # Preloading every service's models would load them all at startup, past the budget
+    readiness.PRELOAD_MODELS = False
+
+    servers = [make_server(args.host, STATUS_PORT, create_status_app(), threaded=True)]
+    for name in args.services:
+        script, port = SERVICES[name]
+        servers.append(make_server(args.host, port, load_service(name, script), threaded=True))
+        logging.info("Serving %s (%s) on port %d", name, script, port)
+
+    threads = [threading.Thread(target=server.serve_forever, daemon=True) for server in servers]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            thread.join()
+    except KeyboardInterrupt:
+        for server in servers:
+            server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+import gc
+import logging
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+from common.backends import TFLiteModel, tflite_path
+
+logger = logging.getLogger(__name__)
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Memory budget shared by every loaded model, in megabytes
+MODEL_MEMORY_BUDGET_MB = float(os.environ.get('MODEL_MEMORY_BUDGET_MB', 1024))
+
+# Runtime for the Keras .h5 models: 'keras' or 'tflite' (a converted variant from common/convert_models.py)
+INFERENCE_BACKEND = os.environ.get('INFERENCE_BACKEND', 'keras')
+TFLITE_QUANTIZATION = os.environ.get('TFLITE_QUANTIZATION', 'dynamic')
+
+# Models served by the suite: name -> (path relative to the repository root, loader)
+MODELS = {
+    'eye_focus': ('adhd/detection.h5', 'keras'),
+    'face_direction': ('adhd/face_direction_model_final.h5', 'keras'),
+    'adhd_activity': ('adhd/Logistic Regression_model.pkl', 'joblib'),
+    'adhd_activity_encoder': ('adhd/label_encoder.pkl', 'joblib'),
+    'dyscalculia': ('dyscalculia/best_model.pkl', 'pickle'),
+    'dyslexia': ('dyslexia/dyslexia_model.h5', 'keras'),
+    'dyslexia_handwriting': ('dyslexia/dyslexia_handwriting_model.h5', 'keras'),
+    'dysgraphia_words': ('dysgraphia/handwriting_dysgraphia_model.h5', 'keras'),
+    'dysgraphia_letters': ('dysgraphia/letter_by_letter_check_model.h5', 'keras'),
+}
+
+
+def keras_source(path):
+    """Returns the file a .h5 model is served from under INFERENCE_BACKEND, and the backend that serves it."""
+    if INFERENCE_BACKEND == 'tflite':
+        converted = tflite_path(path, TFLITE_QUANTIZATION)
+        if os.path.exists(converted):
+            return converted, f'tflite-{TFLITE_QUANTIZATION}'
+    return path, 'keras'
+
+
+def load_keras(path):
+    source, backend = keras_source(path)
+    if backend != 'keras':
+        return TFLiteModel(source)
+    if INFERENCE_BACKEND == 'tflite':
+        logger.warning("No %s conversion of %s, falling back to Keras", TFLITE_QUANTIZATION, path)
+
+    from tensorflow.keras.models import load_model
+    from common.inference import CompiledModel
+
+    model = CompiledModel(load_model(path))
+    model.warm_up()
+    return model
+
+
+def load_joblib(path):
+    import joblib
+    return joblib.load(path)
+
+
+def load_pickle(path):
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+LOADERS = {
+    'keras': load_keras,
+    'joblib': load_joblib,
+    'pickle': load_pickle,
+}
+
+
+def estimate_size(model, path):
+    """Estimates the resident size of a loaded model in bytes."""
+    # Keras models: float32 weights; everything else: size of the serialized file
+    if hasattr(model, 'count_params'):
+        return model.count_params() * 4
+    return os.path.getsize(getattr(model, 'path', path))
+
+
+class ModelRegistry:
+    """Loads models on first use and evicts the least recently used ones
+    once the loaded models exceed the memory budget."""
+
+    def __init__(self, models=None, budget_mb=MODEL_MEMORY_BUDGET_MB):
+        self.models = dict(MODELS if models is None else models)
+        self.budget = int(budget_mb * 1024 * 1024)
+
+        self._loaded = OrderedDict()  # name -> (model, size), least recently used first
+        self._lock = threading.Lock()
+        self._load_locks = {name: threading.Lock() for name in self.models}
+        self._versions = {}  # name -> version of the loaded model
+        self._hits = 0
+        self._loads = 0
+        self._evictions = 0
+
+    def path(self, name):
+        return os.path.join(ROOT, self.models[name][0])
+
+    def get(self, name):
+        """Returns the model registered under `name`, loading it if needed."""
+        with self._lock:
+            if name in self._loaded:
+                self._loaded.move_to_end(name)
+                self._hits += 1
+                return self._loaded[name][0]
+
+        # Load outside the registry lock so other models stay available meanwhile
+        with self._load_locks[name]:
+            with self._lock:
+                if name in self._loaded:
+                    self._loaded.move_to_end(name)
+                    self._hits += 1
+                    return self._loaded[name][0]
+
+            path = self.path(name)
+            version = self._file_version(name)
+            model = LOADERS[self.models[name][1]](path)
+            size = estimate_size(model, path)
+            logger.info("Loaded model %s (%.1f MB)", name, size / 1024 / 1024)
+
+            with self._lock:
+                self._loaded[name] = (model, size)
+                self._versions[name] = version
+                self._loads += 1
+                self._evict(keep=name)
+            return model
+
+    def source(self, name):
+        """Returns the file `name` would be loaded from now, and the backend that would serve it."""
+        path, loader = self.path(name), self.models[name][1]
+        return keras_source(path) if loader == 'keras' else (path, loader)
+
+    def version(self, name):
+        """Identifies the model file and backend serving `name`; changes when either does.
+
+        A loaded model keeps the version of the file it was loaded from until
+        it is evicted, so results are never keyed to a file it hasn't read.
+        """
+        with self._lock:
+            if name in self._versions:
+                return self._versions[name]
+        return self._file_version(name)
+
+    def _file_version(self, name):
+        path, backend = self.source(name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return f'{name}:missing'
+        return f'{name}:{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}:{backend}'
+
+    def is_loaded(self, name):
+        with self._lock:
+            return name in self._loaded
+
+    def stats(self):
+        with self._lock:
+            return {
+                'budget_mb': self.budget / 1024 / 1024,
+                'used_mb': sum(size for _, size in self._loaded.values()) / 1024 / 1024,
+                'loaded': list(self._loaded),
+                'hits': self._hits,
+                'loads': self._loads,
+                'evictions': self._evictions,
+            }
+
+    def _evict(self, keep):
+        # Drop least recently used models until the budget holds (never the one just loaded)
+        evicted = False
+        while sum(size for _, size in self._loaded.values()) > self.budget and len(self._loaded) > 1:
+            name = next(n for n in self._loaded if n != keep)
+            del self._loaded[name]
+            del self._versions[name]
+            self._evictions += 1
+            evicted = True
+            logger.info("Evicted model %s", name)
+        if evicted:
+            gc.collect()
+
+
+# Registry shared by every service running in this process
+registry = ModelRegistry()
@@ -0,0 +1,110 @@
+"""Compares converted TFLite models against the original Keras models.
+
+For every model, the held-out images are run through Keras and through each
+available TFLite variant one image at a time. The report lists how often the
+predicted class agrees with Keras and the per-image latency of every backend.
+
+    python -m common.parity --holdout path/to/images --models eye_focus dyslexia
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.backends import QUANTIZATIONS, TFLiteModel, tflite_path
+from common.model_registry import MODELS, ROOT
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+
+def load_holdout(directory, input_shape, limit=None):
+    """Loads a directory of images as a float32 batch matching a model's (h, w, c) input."""
+    height, width, channels = input_shape[1:4]
+    names = sorted(n for n in os.listdir(directory) if n.lower().endswith(IMAGE_EXTENSIONS))[:limit]
+
+    batch = np.empty((len(names), height, width, channels), dtype=np.float32)
+    for i, name in enumerate(names):
+        img = cv2.imread(os.path.join(directory, name), cv2.IMREAD_GRAYSCALE if channels == 1 else cv2.IMREAD_COLOR)
+        img = cv2.resize(img, (width, height), interpolation=cv2.INTER_AREA)
+        if channels == 3:
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        batch[i] = img.reshape(height, width, channels) / 255.0
+    return batch
+
+
+def predicted_classes(outputs):
+    # Single sigmoid outputs are thresholded, softmax outputs use the arg max
+    outputs = np.asarray(outputs)
+    if outputs.shape[-1] == 1:
+        return (outputs[:, 0] > 0.5).astype(np.intp)
+    return np.argmax(outputs, axis=-1)
+
+
+def run_backend(model, batch):
+    """Runs the held-out images one at a time; returns the classes and the latencies in ms."""
+    model.predict_on_batch(batch[:1])  # warm-up
+    outputs, latencies = [], []
+    for i in range(len(batch)):
+        start = time.perf_counter()
+        outputs.append(model.predict_on_batch(batch[i:i + 1])[0])
+        latencies.append((time.perf_counter() - start) * 1000.0)
+    return predicted_classes(np.stack(outputs)), np.array(latencies)
+
+
+def compare(keras_model, candidates, batch):
+    """Returns a parity report of each candidate backend against the Keras model."""
+    reference, keras_latency = run_backend(keras_model, batch)
+    report = {'keras': latency_summary(keras_latency)}
+    for name, model in candidates.items():
+        classes, latency = run_backend(model, batch)
+        report[name] = latency_summary(latency)
+        report[name]['agreement'] = float(np.mean(classes == reference)) if len(batch) else 0.0
+    return report
+
+
+def latency_summary(latencies):
+    return {
+        'mean_ms': float(np.mean(latencies)),
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p95_ms': float(np.percentile(latencies, 95)),
+    }
+
+
+def main():
+    from tensorflow.keras.models import load_model
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--holdout', required=True, help='directory of held-out images')
+    parser.add_argument('--models', nargs='+', default=[n for n, (_, loader) in MODELS.items() if loader == 'keras'])
+    parser.add_argument('--limit', type=int, default=None, help='use at most this many images')
+    parser.add_argument('--report', help='write the report as JSON to this path')
+    args = parser.parse_args()
+
+    reports = {}
+    for name in args.models:
+        keras_path = os.path.join(ROOT, MODELS[name][0])
+        keras_model = load_model(keras_path)
+        candidates = {
+            f'tflite-{q}': TFLiteModel(tflite_path(keras_path, q))
+            for q in QUANTIZATIONS if os.path.exists(tflite_path(keras_path, q))
+        }
+        batch = load_holdout(args.holdout, keras_model.input_shape, args.limit)
+        reports[name] = compare(keras_model, candidates, batch)
+
+        for backend, result in reports[name].items():
+            agreement = f"{result['agreement']:.2%}" if 'agreement' in result else '-'
+            print(f"{name:22s} {backend:16s} agreement {agreement:>8s}  "
+                  f"mean {result['mean_ms']:7.2f} ms  p95 {result['p95_ms']:7.2f} ms")
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
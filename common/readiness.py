@@ -0,0 +1,47 @@
+import logging
+import os
+import threading
+
+from flask import jsonify
+
+from common.model_registry import registry
+
+logger = logging.getLogger(__name__)
+
+# Load and warm a service's models at startup; common/model_host.py turns this off
+# so that models shared by the host load on first use, under its memory budget
+PRELOAD_MODELS = os.environ.get('PRELOAD_MODELS', '1') != '0'
+
+
+def serve_readiness(app, model_names, warm_up_fn=None):
+    """Loads and warms a service's models in the background and adds a /ready route.
+
+    /ready answers 503 until every model has been loaded and warmed up (and
+    `warm_up_fn`, if given, has run), so a load balancer only sends traffic
+    once the service is fast; it goes back to 503 if a model is evicted. With
+    PRELOAD_MODELS off, only `warm_up_fn` runs and models load on first use.
+    Either way, /ready lists which of the service's models are loaded.
+    """
+    state = {'ready': False, 'error': None}
+    preload = PRELOAD_MODELS
+
+    def warm_up():
+        try:
+            if preload:
+                for name in model_names:
+                    registry.get(name)
+            if warm_up_fn is not None:
+                warm_up_fn()
+            state['ready'] = True
+        except Exception as e:
+            state['error'] = str(e)
+            logger.exception("Warm-up failed for %s", ', '.join(model_names) or 'service')
+
+    threading.Thread(target=warm_up, daemon=True).start()
+
+    @app.route('/ready', methods=['GET'])
+    def ready():
+        loaded = {name: registry.is_loaded(name) for name in model_names}
+        if state['ready'] and (not preload or all(loaded.values())):
+            return jsonify({'ready': True, 'models': loaded})
+        return jsonify({'ready': False, 'models': loaded, 'error': state['error']}), 503
@@ -0,0 +1,126 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import cv2
+import numpy as np
+from flask import jsonify
+
+from common.model_registry import registry
+
+# Entries kept per service, and how long a result stays valid in seconds
+RESULT_CACHE_SIZE = int(os.environ.get('RESULT_CACHE_SIZE', 256))
+RESULT_CACHE_TTL = float(os.environ.get('RESULT_CACHE_TTL', 3600))
+
+
+def cache_key(data, *versions):
+    """Content address of an upload: hash of its bytes plus the versions of the models that score it."""
+    digest = hashlib.sha256(data)
+    for version in versions:
+        digest.update(b'\0' + str(version).encode())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """LRU + TTL cache of prediction results that coalesces concurrent identical requests.
+
+    The first request for a key computes the result; identical requests that
+    arrive while it is running wait for that result instead of recomputing it.
+    Failures are not cached and are raised to every waiting caller.
+    """
+
+    def __init__(self, max_entries=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self._entries = OrderedDict()  # key -> (expiry, result), least recently used first
+        self._inflight = {}  # key -> Future of the computation in progress
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return entry[1]
+                del self._entries[key]
+                self._expirations += 1
+
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+                self._misses += 1
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = compute()
+        except Exception as e:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, result)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+            del self._inflight[key]
+        future.set_result(result)
+        return result
+
+    def get_or_compute_upload(self, data, model_names, analyze):
+        """Answers an upload from the cache, keyed by its bytes and the versions of `model_names`.
+
+        A miss runs `analyze(data)`; re-submitted photos get the stored result.
+        """
+        key = cache_key(data, *(registry.version(name) for name in model_names))
+        return self.get_or_compute(key, lambda: analyze(data))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses,
+                'coalesced': self._coalesced,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+            }
+
+
+def add_cache_routes(app, cache=None):
+    """Gives a service a result cache (a new one unless `cache` is passed) and a /cache/stats route for it."""
+    cache = ResultCache() if cache is None else cache
+
+    @app.route('/cache/stats', methods=['GET'])
+    def cache_stats():
+        return jsonify(cache.stats())
+
+    return cache
+
+
+def decode_upload(data):
+    """Decodes uploaded image bytes in memory to a BGR array; raises ValueError if they are no image."""
+    # imdecode asserts on an empty buffer instead of returning None
+    image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR) if data else None
+    if image is None:
+        raise ValueError('Invalid image')
+    return image
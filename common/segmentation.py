@@ -0,0 +1,175 @@
+"""Line, word and glyph segmentation shared by the handwriting services.
+
+The page is downscaled, then converted to grayscale, in that order as the
+per-service code did (graying first resamples a third of the data but moves
+enough pixels to lose words), and binarized once. Lines, words
+and glyphs are the outer contours of the binary page dilated with a wide
+kernel, a narrow kernel and no kernel at all, so each level is a single contour
+pass over the whole page instead of one pass per line or word ROI. Boxes come back as NumPy arrays, and each child is
+assigned to its parent with vectorized box containment. Because the word mask
+lies inside the line mask and the binary page inside the word mask, a child box
+always lies inside its parent's box; the rare ties between overlapping parent
+boxes are settled with a point-in-contour test.
+
+Glyphs are cut, as before, from each word's own Otsu binarization of its box.
+Word boxes can overlap, so each is thresholded into its own slot of a mosaic,
+with the slots packed in rows one pixel apart. The glyph contours of all words
+then come from a single pass over the mosaic. Every word still sees only its
+own box, clipped glyphs and all, exactly as the per-word code did.
+"""
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+# Pages wider than this are downscaled before segmentation
+MAX_WIDTH = 1000
+
+# Ink is anything darker than this on the grayscale page
+INK_THRESHOLD = 80
+
+WORD_KERNEL = np.ones((3, 15), np.uint8)
+# Dilating the word mask by 1x71 gives exactly the 3x85 line dilation of the binary page
+LINE_FROM_WORD_KERNEL = np.ones((1, 71), np.uint8)
+
+# Words with less dilated area than this are noise
+MIN_WORD_AREA = 400
+
+# Glyphs must be wider and taller than this
+MIN_GLYPH_WIDTH, MIN_GLYPH_HEIGHT = 5, 10
+
+# Boxes are (x, y, w, h) rows; word_line and glyph_word give each box's parent index.
+# binary is the page thresholded at INK_THRESHOLD (word crops); glyph_binary is the mosaic
+# of per-word Otsu binarizations, and glyph_crops the box of each glyph within it
+Segmentation = namedtuple('Segmentation', ['gray', 'binary', 'lines', 'words', 'word_line', 'glyphs', 'glyph_word',
+                                           'glyph_binary', 'glyph_crops'])
+
+
+def resize_page(image, max_width=MAX_WIDTH):
+    """Downscales a page to `max_width` keeping its aspect ratio."""
+    h, w = image.shape[:2]
+    if max_width is None or w <= max_width:
+        return image
+    new_h = int(max_width / (w / h))
+    return cv2.resize(image, (max_width, new_h), interpolation=cv2.INTER_AREA)
+
+
+def contour_boxes(mask):
+    """Returns the outer contours of a mask with their (x, y, w, h) boxes and one pixel of each."""
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    boxes = np.array([cv2.boundingRect(c) for c in contours], dtype=np.int32).reshape(-1, 4)
+    anchors = np.array([c[0, 0] for c in contours], dtype=np.int32).reshape(-1, 2)
+    return contours, boxes, anchors
+
+
+def assign_parents(boxes, anchors, parent_boxes, parent_contours, chunk=4096):
+    """Returns the index of the parent whose box contains each child box (-1 if none)."""
+    parents = np.full(len(boxes), -1, dtype=np.int32)
+    if len(parent_boxes) == 0:
+        return parents
+
+    px, py = parent_boxes[:, 0], parent_boxes[:, 1]
+    px2, py2 = px + parent_boxes[:, 2], py + parent_boxes[:, 3]
+    for start in range(0, len(boxes), chunk):
+        x, y, w, h = (boxes[start:start + chunk, i, np.newaxis] for i in range(4))
+        inside = (px <= x) & (py <= y) & (px2 >= x + w) & (py2 >= y + h)
+        candidates = inside.sum(axis=1)
+        parents[start:start + chunk] = np.where(candidates > 0, np.argmax(inside, axis=1), -1)
+
+        # Overlapping parent boxes: keep the parent whose contour holds the child's pixel
+        for i in np.flatnonzero(candidates > 1):
+            point = tuple(float(v) for v in anchors[start + i])
+            for parent in np.flatnonzero(inside[i]):
+                if cv2.pointPolygonTest(parent_contours[parent], point, False) >= 0:
+                    parents[start + i] = parent
+                    break
+    return parents
+
+
+def pack_boxes(boxes, width):
+    """Places the boxes' (w, h) sizes in rows of a `width`-wide canvas, one pixel apart.
+
+    Returns the (N, 2) x, y slot of each box and the canvas height.
+    """
+    slots = np.zeros((len(boxes), 2), dtype=np.int32)
+    x = y = row_height = 0
+    for i, (_, _, w, h) in enumerate(boxes):
+        if x and x + w > width:
+            x, y, row_height = 0, y + row_height + 1, 0
+        slots[i] = x, y
+        x += w + 1
+        row_height = max(row_height, h)
+    return slots, y + row_height
+
+
+def word_glyphs(gray, words):
+    """Returns the mosaic of per-word Otsu binarizations, and each glyph's mosaic box, page box and word."""
+    width = max(gray.shape[1], int(words[:, 2].max(initial=0)))
+    slots, height = pack_boxes(words, width)
+    mosaic = np.zeros((max(height, 1), width), dtype=np.uint8)
+    for (x, y, w, h), (sx, sy) in zip(words, slots):
+        # Thresholding writes straight into the word's slot; no contour pass per word
+        cv2.threshold(gray[y:y + h, x:x + w], 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU,
+                      dst=mosaic[sy:sy + h, sx:sx + w])
+
+    contours, crops, anchors = contour_boxes(mosaic)
+    # Slots are disjoint, so box containment alone finds each glyph's word
+    slot_boxes = np.column_stack([slots, words[:, 2:]])
+    glyph_word = assign_parents(crops, anchors, slot_boxes, None)
+    keep = np.flatnonzero((glyph_word >= 0) & (crops[:, 2] > MIN_GLYPH_WIDTH) & (crops[:, 3] > MIN_GLYPH_HEIGHT))
+    # Left to right within each word, words in reading order
+    keep = keep[np.lexsort((crops[keep, 0], glyph_word[keep]))]
+    crops, glyph_word = crops[keep], glyph_word[keep]
+
+    glyphs = crops.copy()
+    glyphs[:, :2] += words[glyph_word, :2] - slots[glyph_word]
+    return mosaic, crops, glyphs, glyph_word
+
+
+def segment_page(image, max_width=MAX_WIDTH, with_glyphs=True):
+    """Segments a BGR or grayscale page into line, word and glyph boxes in reading order.
+
+    Services that only need words can skip the glyph pass with `with_glyphs=False`.
+    """
+    image = resize_page(image, max_width)
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    _, binary = cv2.threshold(gray, INK_THRESHOLD, 255, cv2.THRESH_BINARY_INV)
+
+    word_mask = cv2.dilate(binary, WORD_KERNEL, iterations=1)
+    line_contours, lines, _ = contour_boxes(cv2.dilate(word_mask, LINE_FROM_WORD_KERNEL, iterations=1))
+    word_contours, words, word_anchors = contour_boxes(word_mask)
+
+    # Lines top to bottom
+    line_order = np.argsort(lines[:, 1], kind='stable')
+    line_rank = np.empty(len(line_order), dtype=np.int32)
+    line_rank[line_order] = np.arange(len(line_order))
+
+    # Words left to right within each line, noise dropped
+    word_line = line_rank[assign_parents(words, word_anchors, lines, line_contours)]
+    word_area = np.array([cv2.contourArea(c) for c in word_contours])
+    keep = np.flatnonzero(word_area >= MIN_WORD_AREA)
+    keep = keep[np.lexsort((words[keep, 0], word_line[keep]))]
+
+    if not with_glyphs:
+        return Segmentation(gray, binary, lines[line_order], words[keep], word_line[keep],
+                            np.empty((0, 4), np.int32), np.empty(0, np.int32), None, np.empty((0, 4), np.int32))
+
+    # Glyphs left to right within each kept word, from each word's own Otsu binarization
+    glyph_binary, glyph_crops, glyphs, glyph_word = word_glyphs(gray, words[keep])
+
+    return Segmentation(
+        gray=gray,
+        binary=binary,
+        lines=lines[line_order],
+        words=words[keep],
+        word_line=word_line[keep],
+        glyphs=glyphs,
+        glyph_word=glyph_word,
+        glyph_binary=glyph_binary,
+        glyph_crops=glyph_crops,
+    )
+
+
+def crop(image, box):
+    x, y, w, h = box
+    return image[y:y + h, x:x + w]
@@ -1,30 +1,25 @@
-import pickle
+import os
+import sys
 import numpy as np
 from flask import Flask, request, jsonify
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.model_registry import registry
+from common.readiness import serve_readiness
+from dyscalculia.lookup_table import columns, load_or_build_table, table_index
+
 app = Flask(__name__)
 
-# Load the best model from the saved file
-with open('best_model.pkl', 'rb') as f:
-    best_model = pickle.load(f)
+# Precomputed predictions over every binary input, loaded in the background
+lookup = {}
+
+def load_lookup_table():
+    # Published in one update, so a request never sees half a table
+    classes, codes = load_or_build_table()
+    lookup.update(classes=classes, codes=codes)
 
-# Define column names (features)
-columns = [
-    "Quick dot recognition",
-    "addition",
-    "subtraction",
-    "object divison",
-    "count apples",
-    "number line addition",
-    "pattern recognition",
-    "guess object count",
-    "number pattern",
-    "money question",
-    "object value assign",
-    "increse order",
-    "decrese order",
-    "length"
-]
+# /ready reports once the lookup table is loaded
+serve_readiness(app, [], load_lookup_table)
 
 @app.route('/predict', methods=['GET'])
 def predict():
@@ -32,10 +27,16 @@ def predict():
         # Get input values from request parameters
         input_values = [int(request.args.get(col, 0)) for col in columns]
         
+        # Binary answers are looked up; anything else goes to the model
+        index = table_index(input_values)
+        if index is not None and lookup:
+            return jsonify({'prediction': int(lookup['classes'][lookup['codes'][index]])})
+        
         # Convert to numpy array for model prediction
         sample_values = np.array([input_values])
         
         # Make predictions using the model
+        best_model = registry.get('dyscalculia')
         prediction = best_model.predict(sample_values)
         
         return jsonify({'prediction': int(prediction[0])})
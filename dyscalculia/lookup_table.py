@@ -0,0 +1,107 @@
+"""Precomputes the dyscalculia model over its whole binary input space.
+
+The model takes 14 pass/fail task outcomes, so there are only 2**14 = 16,384
+possible inputs. Every one of them is scored once and the predictions are
+stored bit-indexed (input i has task k passed when bit k of i is set), tied to
+the SHA-256 of best_model.pkl so a retrained model is never answered from a
+stale table. /predict then answers binary inputs with an array lookup.
+
+    python lookup_table.py    # rebuild best_model_lut.npz next to best_model.pkl
+"""
+import hashlib
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.model_registry import registry
+
+# Define column names (features)
+columns = [
+    "Quick dot recognition",
+    "addition",
+    "subtraction",
+    "object divison",
+    "count apples",
+    "number line addition",
+    "pattern recognition",
+    "guess object count",
+    "number pattern",
+    "money question",
+    "object value assign",
+    "increse order",
+    "decrese order",
+    "length"
+]
+
+# Weight of each task's bit in the table index
+BIT_WEIGHTS = 1 << np.arange(len(columns))
+
+TABLE_PATH = os.path.splitext(registry.path('dyscalculia'))[0] + '_lut.npz'
+
+
+def model_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def feature_space():
+    """Returns every binary input as a (2**14, 14) array; row i is the bit pattern of i."""
+    return ((np.arange(1 << len(columns))[:, np.newaxis] & BIT_WEIGHTS) > 0).astype(int)
+
+
+def build_table(model):
+    """Scores every binary input; returns the distinct classes and each input's class code."""
+    classes, codes = np.unique(model.predict(feature_space()), return_inverse=True)
+    return classes, codes.astype(np.uint8)
+
+
+def save_table(path, classes, codes, sha256):
+    # Two-class models pack one bit per input (2 KB); otherwise one byte per input
+    packed = len(classes) <= 2
+    np.savez_compressed(
+        path,
+        classes=classes,
+        codes=np.packbits(codes) if packed else codes,
+        packed=packed,
+        model_sha256=sha256,
+    )
+
+
+def load_table(path, sha256):
+    """Returns (classes, codes) from a saved table, or None if it is missing or for another model."""
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as saved:
+        if str(saved['model_sha256']) != sha256:
+            return None
+        codes = saved['codes']
+        if saved['packed']:
+            codes = np.unpackbits(codes)[:1 << len(columns)]
+        return saved['classes'], codes
+
+
+def load_or_build_table(path=TABLE_PATH):
+    """Loads the table for the current best_model.pkl, building and saving it when needed."""
+    sha256 = model_hash(registry.path('dyscalculia'))
+    table = load_table(path, sha256)
+    if table is None:
+        table = build_table(registry.get('dyscalculia'))
+        save_table(path, *table, sha256)
+    return table
+
+
+def table_index(input_values):
+    """Returns the table index of a list of 0/1 task outcomes, or None if any outcome isn't binary."""
+    values = np.asarray(input_values)
+    if not np.isin(values, (0, 1)).all():
+        return None
+    return int(values @ BIT_WEIGHTS)
+
+
+if __name__ == '__main__':
+    sha256 = model_hash(registry.path('dyscalculia'))
+    classes, codes = build_table(registry.get('dyscalculia'))
+    save_table(TABLE_PATH, classes, codes, sha256)
+    print(f"Wrote {TABLE_PATH}: {len(codes)} inputs, classes {classes.tolist()}")
@@ -1,55 +1,29 @@
-import cv2
-import numpy as np
-from flask import Flask, request, jsonify
 import os
+import sys
+from flask import Flask, request, jsonify
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.result_cache import decode_upload
+from dysgraphia.ruled_lines import analyze_letter_position
 
 app = Flask(__name__)
-UPLOAD_FOLDER = 'uploads'
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
 @app.route('/upload', methods=['POST'])
 def upload_image():
     if 'file' not in request.files:
         return jsonify({'error': 'No image provided'}), 400
 
+    # Decode the upload in memory
     file = request.files['file']
-    filepath = os.path.join(UPLOAD_FOLDER, file.filename)
-    file.save(filepath)
-
-    # Analyze if letters are inside the two lines
-    result = analyze_letter_position(filepath)
-
-    return jsonify({'prediction': result})
-
-def analyze_letter_position(image_path):
-    image = cv2.imread(image_path)
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-
-    # Apply edge detection to find lines
-    edges = cv2.Canny(gray, 50, 150)
-    lines = cv2.HoughLinesP(edges, 1, np.pi/180, threshold=100, minLineLength=100, maxLineGap=10)
-
-    if lines is None or len(lines) < 2:
-        return "Error: Could not detect two horizontal lines."
-
-    # Sort lines by y-coordinates to get top and bottom lines
-    lines = sorted(lines, key=lambda line: line[0][1])
-    top_line_y = lines[0][0][1]
-    bottom_line_y = lines[-1][0][1]
-
-    # Extract region between two lines
-    region = gray[top_line_y:bottom_line_y, :]
+    try:
+        image = decode_upload(file.read())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    # Count dark pixels in the region (assuming letters are darker than background)
-    text_pixels = np.count_nonzero(region < 128)
-    total_pixels = region.shape[0] * region.shape[1]
-    text_ratio = text_pixels / total_pixels
+    # Analyze if letters are inside the ruled lines, band by band; photos are straightened first unless ?deskew=0
+    result, details = analyze_letter_position(image, deskew=request.args.get('deskew', '1') != '0')
 
-    # If letters exceed the lines, return high potential
-    if text_ratio > 0.3:  # Adjust threshold as needed
-        return "High Potential of Dysgraphia"
-    else:
-        return "Low Potential of Dysgraphia"
+    return jsonify(dict(details, prediction=result))
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5007)
@@ -0,0 +1,278 @@
+"""Ruled-line detection and writing-band analysis (dysgraphia/WritingLines.py).
+
+Ruled lines are found in time linear in the page's pixels. Printed ruling is
+often much fainter than the handwriting and lost by its Otsu threshold, so
+the ink is joined by a morphological black-hat: every pixel darker by
+LINE_CONTRAST than the paper a few rows around it. A horizontal opening, with
+a kernel a quarter of the page wide and run on a copy narrowed 8x, then acts
+as a run-length filter. Only horizontal runs at least that long survive, so
+handwriting disappears and the ruled lines remain. The row projection of what
+is left marks every line's rows, and consecutive lines bound the writing bands.
+
+Letters are judged one glyph at a time: one connectedComponentsWithStats
+pass over the ink gives every glyph's box, and NumPy operations over those
+stats assign each glyph to its band and measure how far it reaches above the
+band's top line or below its bottom line.
+
+The filter tolerates only a fraction of a degree of tilt. The optional deskew
+first finds the rotation (within +-MAX_SKEW_DEGREES) that makes the row
+projection of the filtered line mask sharpest, and straightens the page.
+Handwriting is left out of that score, so a page of slanted writing doesn't
+pull the angle off the ruling, and a page without ruling isn't rotated.
+Lines bent by perspective or a curved page can't all be straightened by one
+rotation; those that stay tilted past the filter's tolerance are missed.
+"""
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+# Shortest horizontal run, as a fraction of the page width, that counts as part of a ruled line
+LINE_MIN_FRACTION = 0.25
+# Rows of vertical tolerance that keep a slightly tilted line in one run, and merge its split rows
+LINE_THICKEN = 3
+# Black-hat response, in gray levels, from which a pixel may belong to a ruled line
+LINE_CONTRAST = 8
+# Height of the black-hat kernel as a fraction of the page height; dark features thinner than this stand out
+LINE_KERNEL_FRACTION = 1 / 128
+# Horizontal downscale of the run-length filter; a column of the filtered mask covers this many pixels
+LINE_SCAN_FACTOR = 8
+# Bands with less ink than this (e.g. the gaps between ruled rows) hold no writing
+EMPTY_BAND_RATIO = 0.02
+# Components smaller than this many pixels are specks, not glyphs
+MIN_GLYPH_AREA = 20
+# Overshoot past a line, as a fraction of the band height, that still counts as inside
+OVERFLOW_TOLERANCE = 0.1
+# Share of overflowing glyphs above which letters are taken to exceed the lines
+OVERFLOW_GLYPH_SHARE = 0.3
+# Deskew search range, final and first-pass steps, in degrees, and the width the search runs at
+MAX_SKEW_DEGREES = 5.0
+SKEW_STEP_DEGREES = 0.25
+SKEW_COARSE_DEGREES = 1.0
+SKEW_SEARCH_WIDTH = 500
+
+# gray: deskewed page; ink: binarized ink (255) with ruled-line pixels removed; line_mask: the ruled lines;
+# lines: (N, 2) first/last row of each ruled line, top to bottom; skew: rotation applied, in degrees
+RuledPage = namedtuple('RuledPage', 'gray ink line_mask lines skew')
+
+
+def binarize(gray):
+    """Ink mask (255 = ink) of a gray page, thresholded globally with Otsu's method."""
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    return binary
+
+
+def line_candidates(gray):
+    """Mask (255) of the pixels at least LINE_CONTRAST darker than the paper just above and below them."""
+    size = max(3, int(gray.shape[0] * LINE_KERNEL_FRACTION) | 1)
+    blackhat = cv2.morphologyEx(gray, cv2.MORPH_BLACKHAT, np.ones((size, 1), np.uint8))
+    _, candidates = cv2.threshold(blackhat, LINE_CONTRAST - 1, 255, cv2.THRESH_BINARY)
+    return candidates
+
+
+def ruled_line_mask(binary):
+    """Keeps only horizontal runs of a mask at least LINE_MIN_FRACTION of the page wide."""
+    height, width = binary.shape
+    thick = cv2.dilate(binary, np.ones((LINE_THICKEN, 1), np.uint8))
+    # Run-length filter at 1/LINE_SCAN_FACTOR width: a column is ink if at least half its pixels are
+    narrow = cv2.resize(thick, (max(1, width // LINE_SCAN_FACTOR), height), interpolation=cv2.INTER_AREA)
+    _, narrow = cv2.threshold(narrow, 127, 255, cv2.THRESH_BINARY)
+    length = max(2, int(narrow.shape[1] * LINE_MIN_FRACTION))
+    runs = cv2.morphologyEx(narrow, cv2.MORPH_OPEN, np.ones((1, length), np.uint8))
+    runs = cv2.resize(runs, (width, height), interpolation=cv2.INTER_NEAREST)
+    # Back to the original mask, so the thickening doesn't widen the lines
+    return cv2.bitwise_and(runs, binary)
+
+
+def line_rows(line_mask, min_fraction=LINE_MIN_FRACTION):
+    """Returns the (N, 2) first/last rows of each horizontal line in a line mask, top to bottom."""
+    profile = cv2.reduce(line_mask, 1, cv2.REDUCE_SUM, dtype=cv2.CV_32S).ravel() // 255
+    rows = profile >= line_mask.shape[1] * min_fraction
+    # Runs of line rows at most LINE_THICKEN apart are one line, however a slight tilt splits its rows
+    rows = cv2.morphologyEx(rows.view(np.uint8)[:, None], cv2.MORPH_CLOSE, np.ones((LINE_THICKEN, 1), np.uint8),
+                            borderType=cv2.BORDER_CONSTANT, borderValue=0).ravel().astype(bool)
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], rows.view(np.int8), [0]))))
+    return edges.reshape(-1, 2) - [0, 1]
+
+
+def rotate(image, degrees, border):
+    height, width = image.shape[:2]
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), degrees, 1.0)
+    return cv2.warpAffine(image, matrix, (width, height), flags=cv2.INTER_LINEAR, borderValue=border)
+
+
+def line_score(candidates, degrees):
+    """Sharpness of the row projection of the ruled lines found in rotated line candidates; 0 if there are none."""
+    height, width = candidates.shape
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), degrees, 1.0)
+    rotated = cv2.warpAffine(candidates, matrix, (width, height), flags=cv2.INTER_NEAREST)
+    profile = cv2.reduce(ruled_line_mask(rotated), 1, cv2.REDUCE_SUM, dtype=cv2.CV_32S).ravel() // 255
+    # Only rows long enough for line_rows to take them as a line count, so stray runs can't tilt the page
+    profile = profile[profile >= width * LINE_MIN_FRACTION].astype(np.int64)
+    return int(np.square(profile).sum())
+
+
+def estimate_skew(gray):
+    """Returns the rotation in degrees that makes the row projection of the page's ruled lines sharpest.
+
+    Candidate angles are scored on a downscaled copy: the line candidates are
+    rotated and run through the run-length filter, so only what would be kept
+    as a ruled line counts, not handwriting or specks. Whole degrees are tried
+    first (the filter keeps a line tilted by up to about a degree and a half at
+    this width), then SKEW_STEP_DEGREES steps around the best of them. A page
+    with no ruled line at any angle is left as it is (0).
+    """
+    scale = min(1.0, SKEW_SEARCH_WIDTH / gray.shape[1])
+    small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    candidates = line_candidates(small)
+
+    coarse = np.arange(-MAX_SKEW_DEGREES, MAX_SKEW_DEGREES + 0.5, SKEW_COARSE_DEGREES)
+    score, degrees = max((line_score(candidates, degrees), degrees) for degrees in coarse)
+    if not score:
+        return 0.0
+    fine = degrees + np.arange(-SKEW_COARSE_DEGREES + SKEW_STEP_DEGREES, SKEW_COARSE_DEGREES, SKEW_STEP_DEGREES)
+    fine = fine[np.abs(fine) <= MAX_SKEW_DEGREES]
+    return float(max(fine, key=lambda degrees: line_score(candidates, degrees)))
+
+
+def find_ruled_lines(gray, deskew=False):
+    """Binarizes a gray page (deskewing it first if asked) and finds all its ruled lines."""
+    skew = estimate_skew(gray) if deskew else 0.0
+    if skew:
+        page = find_ruled_lines(rotate(gray, skew, 255))
+        # A rotation that finds no rule at full resolution isn't reported; the page is measured as it came
+        if len(page.lines):
+            return page._replace(skew=skew)
+
+    binary = binarize(gray)
+    line_mask = ruled_line_mask(cv2.bitwise_or(binary, line_candidates(gray)))
+    ink = cv2.bitwise_and(binary, cv2.bitwise_not(line_mask))
+    return RuledPage(gray, ink, line_mask, line_rows(line_mask), 0.0)
+
+
+def band_text_ratios(page):
+    """Returns the (N - 1, 2) top/bottom rows of the bands between consecutive lines and each band's ink ratio."""
+    lines = page.lines
+    bands = np.stack([lines[:-1, 1] + 1, lines[1:, 0]], axis=1) if len(lines) > 1 else np.zeros((0, 2), np.int64)
+    if not len(bands):
+        return bands, np.zeros(0)
+
+    # Ink pixels per row, summed per band through a cumulative row count
+    row_ink = cv2.reduce(page.ink, 1, cv2.REDUCE_SUM, dtype=cv2.CV_32S).ravel() // 255
+    cumulative = np.concatenate(([0], np.cumsum(row_ink)))
+    heights = np.maximum(bands[:, 1] - bands[:, 0], 1)
+    ratios = (cumulative[bands[:, 1]] - cumulative[bands[:, 0]]) / (heights * page.ink.shape[1])
+    return bands, ratios
+
+
+def bridge_lines(page):
+    """Ink with the ruled-line pixels restored wherever a stroke crosses the line, so crossing glyphs stay whole."""
+    thickness = int((page.lines[:, 1] - page.lines[:, 0]).max()) + 1 if len(page.lines) else 1
+    # Line removal can cut a stroke over the line's rows plus the LINE_THICKEN tolerance
+    gap = thickness + LINE_THICKEN
+    closed = cv2.morphologyEx(page.ink, cv2.MORPH_CLOSE, np.ones((gap + 1, 1), np.uint8))
+    return cv2.bitwise_or(page.ink, cv2.bitwise_and(closed, page.line_mask))
+
+
+def glyph_stats(page):
+    """Returns the (N, 5) x, y, w, h, area stats and (N, 2) centroids of every ink component, background excluded."""
+    # Grana's block-based labelling, the fastest of OpenCV's algorithms on text pages
+    _, _, stats, centroids = cv2.connectedComponentsWithStatsWithAlgorithm(
+        bridge_lines(page), 8, cv2.CV_32S, cv2.CCL_GRANA)
+    return stats[1:], centroids[1:]
+
+
+def glyph_overflow(page, bands):
+    """Measures every glyph against the band it belongs to.
+
+    Glyphs come from one connected-components pass; each is assigned to the
+    band it is written on, by its bottom edge: letters rest on a band's bottom
+    line, so a tall letter reaching over its top line still belongs to it. A
+    glyph that crosses a band's top line but ends in that band's upper half
+    rests on no line there; it hangs from the band above and overflows below
+    that band's line. Glyphs that lie wholly outside their band (headings,
+    margins) are ignored. Returns per-band and
+    page statistics; `bands` are the written bands, top to bottom.
+    """
+    stats, _ = glyph_stats(page)
+    heights = np.maximum(bands[:, 1] - bands[:, 0], 1)
+    glyphs = stats[:, cv2.CC_STAT_AREA] >= MIN_GLYPH_AREA
+
+    top = stats[:, cv2.CC_STAT_TOP]
+    bottom = top + stats[:, cv2.CC_STAT_HEIGHT] - 1
+    # Band by baseline: the first band whose bottom line the glyph's bottom edge doesn't pass (beyond tolerance)
+    band = np.minimum(np.searchsorted(bands[:, 1] + OVERFLOW_TOLERANCE * heights, bottom), len(bands) - 1)
+    hanging = (band > 0) & (top < bands[band, 0]) & (bottom < bands[band, 0] + heights[band] // 2)
+    band -= hanging
+    # Only glyphs that overlap their band count, and nothing taller than three bands (borders, smudges)
+    glyphs &= (bottom >= bands[band, 0]) & (top <= bands[band, 1])
+    glyphs &= stats[:, cv2.CC_STAT_HEIGHT] <= 3 * heights[band]
+    band, top, bottom = band[glyphs], top[glyphs], bottom[glyphs]
+
+    above = np.maximum(bands[band, 0] - top, 0) / heights[band]
+    below = np.maximum(bottom - bands[band, 1], 0) / heights[band]
+    overflow = np.maximum(above, below)
+    overflowing = overflow > OVERFLOW_TOLERANCE
+
+    # Per-band aggregates over the glyph arrays
+    band_glyphs = np.bincount(band, minlength=len(bands))
+    band_overflowing = np.bincount(band, weights=overflowing, minlength=len(bands))
+    band_max_above = np.zeros(len(bands))
+    band_max_below = np.zeros(len(bands))
+    np.maximum.at(band_max_above, band, above)
+    np.maximum.at(band_max_below, band, below)
+
+    per_band = [
+        {
+            'glyphs': int(n),
+            'overflowing_glyphs': int(o),
+            'overflow_share': round(float(o / n), 4) if n else 0.0,
+            'max_overflow_above': round(float(a), 4),
+            'max_overflow_below': round(float(b), 4),
+        }
+        for n, o, a, b in zip(band_glyphs, band_overflowing, band_max_above, band_max_below)
+    ]
+    per_page = {
+        'glyphs': int(len(band)),
+        'overflowing_glyphs': int(overflowing.sum()),
+        'overflow_share': round(float(overflowing.mean()), 4) if len(band) else 0.0,
+        'overflowing_above': int((above > OVERFLOW_TOLERANCE).sum()),
+        'overflowing_below': int((below > OVERFLOW_TOLERANCE).sum()),
+        'mean_overflow': round(float(overflow[overflowing].mean()), 4) if overflowing.any() else 0.0,
+        'max_overflow': round(float(overflow.max()), 4) if len(band) else 0.0,
+    }
+    return per_band, per_page
+
+
+def analyze_letter_position(image, deskew=False):
+    """Returns (review, details) for a BGR page; details lists the lines, every band's text ratio and glyph overflow."""
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    page = find_ruled_lines(gray, deskew)
+    details = {
+        'lines': [int(top + bottom) // 2 for top, bottom in page.lines],
+        'skew_degrees': page.skew,
+    }
+    if len(page.lines) < 2:
+        return "Error: Could not detect two horizontal lines.", details
+
+    bands, ratios = band_text_ratios(page)
+    written = ratios >= EMPTY_BAND_RATIO
+    details['bands'] = [
+        {'top': int(top), 'bottom': int(bottom), 'text_ratio': round(float(ratio), 4), 'written': bool(has_text)}
+        for (top, bottom), ratio, has_text in zip(bands, ratios, written)
+    ]
+    # Share of dark pixels over the written bands together (the one band on a two-line page)
+    if not written.any():
+        written[:] = True
+    heights = np.maximum(bands[:, 1] - bands[:, 0], 1)[written]
+    details['text_ratio'] = round(float(np.sum(ratios[written] * heights) / np.sum(heights)), 4)
+
+    # How far each glyph reaches past its band's lines
+    per_band, details['overflow'] = glyph_overflow(page, bands[written])
+    for band, stats in zip((band for band in details['bands'] if band['written']), per_band):
+        band['overflow'] = stats
+
+    # If letters exceed the lines, return high potential
+    if details['overflow']['overflow_share'] > OVERFLOW_GLYPH_SHARE:
+        return "High Potential of Dysgraphia", details
+    return "Low Potential of Dysgraphia", details
@@ -1,17 +1,20 @@
 import os
+import sys
 import cv2
 import numpy as np
 import tensorflow as tf
 from tensorflow.keras.preprocessing import image
-from tensorflow.keras.models import load_model
 from flask import Flask, request, jsonify
 from PIL import Image
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.model_registry import registry
+from common.readiness import serve_readiness
+
 app = Flask(__name__)
 
-# Load the trained model
-MODEL_PATH = 'dyslexia_model.h5'
-model = load_model(MODEL_PATH)
+# Load and warm up the models in the background; /ready reports when done
+serve_readiness(app, ['dyslexia'])
 
 # Class names
 CLASS_NAMES = ['Corrected', 'Normal', 'Reversal']
@@ -53,6 +56,7 @@ def segment_characters(word_img):
 # Predict dyslexia category
 def predict_dyslexia(img):
     preprocessed_image = preprocess_image(img)
+    model = registry.get('dyslexia')
     predictions = model.predict(preprocessed_image)
     return CLASS_NAMES[np.argmax(predictions)]
 
@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, request, jsonify
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.handwriting import analyze_letters, analyze_reversals, analyze_words
+from common.readiness import serve_readiness
+from common.result_cache import decode_upload
+from common.segmentation import segment_page
+
+app = Flask(__name__)
+
+# Load and warm up the models in the background; /ready reports when done
+serve_readiness(app, ['dyslexia_handwriting', 'dysgraphia_words', 'dysgraphia_letters'])
+
+# Analyses run on every worksheet: report key -> analysis of the segmented page
+ANALYSES = {
+    'dyslexia': analyze_reversals,
+    'dysgraphia': analyze_words,
+    'letter_by_letter': analyze_letters,
+}
+
+# The models release the GIL while they run, so the analyses overlap
+executor = ThreadPoolExecutor(max_workers=len(ANALYSES))
+
+def run_analysis(analysis, segmentation):
+    try:
+        return analysis(segmentation)
+    except ValueError as e:
+        return {'error': str(e)}
+
+@app.route('/predict', methods=['POST'])
+def predict():
+    if 'file' not in request.files:
+        return jsonify({'error': 'No file uploaded'}), 400
+
+    file = request.files['file']
+    start = time.perf_counter()
+    try:
+        image = decode_upload(file.read())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Decode and segment once, then fan the page out to every model
+    segmentation = segment_page(image)
+    futures = {key: executor.submit(run_analysis, analysis, segmentation) for key, analysis in ANALYSES.items()}
+    report = {key: future.result() for key, future in futures.items()}
+
+    report['words'] = len(segmentation.words)
+    report['characters'] = len(segmentation.glyphs)
+    report['elapsed_ms'] = (time.perf_counter() - start) * 1000.0
+    return jsonify(report)
+
+if __name__ == '__main__':
+    app.run(debug=True, host='0.0.0.0', port=5011)